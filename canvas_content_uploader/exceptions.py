@@ -2,5 +2,13 @@ class UserCanceledUpload(Exception):
     pass
 
 
+class UploadCanceled(Exception):
+    pass
+
+
 class NoCoursesLoaded(Exception):
     pass
+
+
+class GraphQLQueryFailed(Exception):
+    pass
@@ -1,18 +1,24 @@
 import tkinter
 from abc import ABC, abstractmethod
+from datetime import datetime
 from enum import Enum
 from pathlib import Path
 from tkinter import ttk, messagebox, filedialog
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, List, Tuple
 
 from canvasapi.exceptions import Unauthorized
 
-from canvas_content_uploader.gui_abcs.Task import Task, show_progress_bar
+from canvas_content_uploader.gui_abcs.Task import Task
+from canvas_content_uploader.root_components.FilterableListbox import FilterableListbox
 
 if TYPE_CHECKING:
     from canvas_content_uploader.root_components.MasterGui import MasterGui
 
 
+# The number of failed items listed by name in a bulk operation's failure report.
+MAX_LISTED_FAILURES = 10
+
+
 class SortMode(Enum):
     MOST_RECENT_UPDATE = 'Most Recently Updated'
     ALPHA = 'Alphabetical'
@@ -25,32 +31,23 @@ class ContentManager(Task, ABC):
     def __init__(self, master_gui: 'MasterGui', item_name: str, has_publish_btn=False, has_download_btn=False):
         super().__init__(master_gui)
         self.item_name = item_name
-        self.item_list_var = tkinter.StringVar()
         self.sort_var = tkinter.StringVar()
         self.sort_var.set(SortMode.ALPHA.value)
         self.has_publish_btn = has_publish_btn
         self.has_download_btn = has_download_btn
+        self.content_kind = None
+        self.loaded_items = []
+        self.loaded_course_id = None
+        self.loaded_version = None
+        self.loaded_at = None
+        self.load_job = None
+        self.bulk_job = None
 
         if self.has_publish_btn:
             self.PUBLISHED_STR = '(P) '
 
-        self.item_frame = ttk.Frame(self.frame)
-
-        self.item_listbox = tkinter.Listbox(self.item_frame, width=30, relief='sunken', state='disabled',
-                                            activestyle='none', selectmode='extended',
-                                            listvariable=self.item_list_var)
-        self.item_listbox.bind('<Double-1>', lambda x: self.double_click_callback())
-
-        self.x_scroll = ttk.Scrollbar(self.item_frame, orient='horizontal',
-                                      command=self.item_listbox.xview)
-        self.y_scroll = ttk.Scrollbar(self.item_frame, orient='vertical',
-                                      command=self.item_listbox.yview)
-        self.item_listbox.configure(xscrollcommand=self.x_scroll.set,
-                                    yscrollcommand=self.y_scroll.set)
-
-        self.item_listbox.grid(row=0, column=0, sticky='NSE')
-        self.x_scroll.grid(row=1, column=0, sticky='NEW')
-        self.y_scroll.grid(row=0, column=1, sticky='NSW')
+        self.item_list = FilterableListbox(self.frame, width=30, selectmode='extended')
+        self.item_list.bind_double_click(self.double_click_callback)
 
         self.button_frame = ttk.Frame(self.frame)
 
@@ -79,17 +76,24 @@ class ContentManager(Task, ABC):
         self.sort_combo = ttk.Combobox(self.combo_frame, width=22, values=sort_options,
                                        textvariable=self.sort_var,
                                        state='disabled')
+        self.refresh_btn = ttk.Button(self.combo_frame, text='Refresh', command=self.refresh_items,
+                                      state='disabled')
+        self.loaded_lbl = ttk.Label(self.combo_frame, text='')
         self.sort_combo_lbl.grid(row=0, column=0, sticky='NW')
         self.sort_combo.grid(row=1, column=0, sticky='NW', padx=5, pady=5)
+        self.refresh_btn.grid(row=2, column=0, sticky='NW', padx=5, pady=5)
+        self.loaded_lbl.grid(row=3, column=0, sticky='NW', padx=5)
 
         self.button_frame.grid(row=1, column=2, sticky='SW')
-        self.item_frame.grid(row=0, column=0, rowspan=2)
+        self.item_list.grid(row=0, column=0, rowspan=2)
         self.combo_frame.grid(row=0, column=2, sticky='NW')
 
-        self.sort_var.trace('wu', lambda x, y, z: self.update_content_list())
+        self.sort_var.trace('wu', lambda x, y, z: self.show_items(self.loaded_items))
 
+    # get_items, publish_item, prepare_download, download_item and delete_item are called from worker threads,
+    # so implementations must not touch any widgets, and are given the course to work on.
     @abstractmethod
-    def get_items(self):
+    def get_items(self, course_id: int):
         pass
 
     @abstractmethod
@@ -108,41 +112,50 @@ class ContentManager(Task, ABC):
     def cleanup_displayed_name(self, displayed_name):
         pass
 
-    def publish_item_by_displayed_name(self, displayed_name):
+    def publish_item(self, course_id: int, displayed_name, item):
+        """
+        Publish an item. Returns the updated item.
+        """
+        return item
+
+    def download_item(self, course_id: int, displayed_name, output_dir):
         pass
 
-    def download_item_by_displayed_name(self, displayed_name, output_dir):
+    def prepare_download(self, course_id: int, selected_items):
         pass
 
     @abstractmethod
-    def delete_item_by_displayed_name(self, displayed_name):
+    def delete_item(self, course_id: int, displayed_name, item):
         pass
 
+    def remove_loaded_item(self, item):
+        self.loaded_items.remove(item)
+
     @abstractmethod
     def double_click_callback(self):
         pass
 
-    def get_selected_item(self):
-        index = self.item_listbox.curselection()
-        item = self.item_listbox.get(index)
-        if self.has_publish_btn:
-            return self.cleanup_displayed_name(item)
-        return item
-
     def handle_course_change(self):
         self.update_content_list()
 
     def enable_selection(self):
-        self.item_listbox.configure(state='normal')
+        self.item_list.enable()
         self.enable_buttons()
         self.sort_combo_lbl.configure(state='enable')
         self.sort_combo.configure(state='readonly')
 
+        self.update_refresh_btn()
         course_id = self.get_selected_course_id()
         if course_id:
-            self.load_and_sort_items()
+            # Another task may have changed this kind of content while this task was hidden.
+            version = self.course_data.get_version(self.content_kind)
+            if course_id != self.loaded_course_id or version != self.loaded_version:
+                self.load_and_sort_items()
 
     def enable_buttons(self):
+        # The item buttons stay disabled until a running bulk operation finishes.
+        if self.bulk_job:
+            return
         self.delete_btn.configure(state='enable')
         if self.has_publish_btn:
             self.publish_btn.configure(state='enable')
@@ -156,10 +169,46 @@ class ContentManager(Task, ABC):
             self.download_btn.configure(state='disable')
         self.delete_btn.configure(state='disable')
 
-    @show_progress_bar
+    def update_refresh_btn(self):
+        if self.get_selected_course_id() and not self.bulk_job:
+            self.refresh_btn.configure(state='enable')
+        else:
+            self.refresh_btn.configure(state='disabled')
+
+    def refresh_items(self):
+        self.course_data.invalidate(self.content_kind)
+        self.load_and_sort_items()
+
     def load_and_sort_items(self):
-        item_list = self.get_items()
+        """
+        Load the items of the selected course from the shared course data. Only needed when the course or the shared
+        listing changes, since sorting and local changes reuse the loaded items.
+        """
+        if self.load_job:
+            self.load_job.cancel()
 
+        course_id = self.get_selected_course_id()
+
+        def get_items_and_version(job):
+            if job.cancelled:
+                return None
+            item_list = self.get_items(course_id)
+            return item_list, self.course_data.get_version(self.content_kind)
+
+        def show_loaded_items(result):
+            # Ignore a load that was canceled or replaced by a newer one before it finished.
+            if result is not None and job is self.load_job:
+                item_list, version = result
+                self.loaded_course_id = course_id
+                self.loaded_version = version
+                self.loaded_at = datetime.now()
+                self.loaded_lbl.configure(text=f'Loaded at {self.loaded_at:%H:%M:%S}')
+                self.show_items(item_list)
+
+        job = self.run_in_background(get_items_and_version, on_done=show_loaded_items)
+        self.load_job = job
+
+    def show_items(self, item_list):
         sort_mode = self.sort_var.get()
 
         if sort_mode == SortMode.MOST_RECENT_UPDATE.value:
@@ -169,79 +218,199 @@ class ContentManager(Task, ABC):
 
         displayed_items = self.get_display_names(item_list)
 
-        self.item_list_var.set(displayed_items)
+        self.loaded_items = item_list
+        self.item_list.set_names(displayed_items)
 
         self.clear_selections()
 
+        if not item_list:
+            self.disable_buttons()
+        else:
+            self.enable_buttons()
+
     def clear_selections(self):
-        self.item_listbox.selection_clear(0, 'end')
+        self.item_list.clear_selection()
 
     def update_content_list(self):
         course_id = self.get_selected_course_id()
+        self.update_refresh_btn()
 
         if course_id:
             self.load_and_sort_items()
         else:
-            self.item_list_var.set('')
-
-        loaded_items = self.item_list_var.get()
-
-        if not loaded_items:
-            self.disable_buttons()
-        else:
-            self.enable_buttons()
+            self.load_job = None
+            self.loaded_course_id = None
+            self.loaded_version = None
+            self.loaded_at = None
+            self.loaded_lbl.configure(text='')
+            self.show_items([])
 
     def get_selected_course_id(self):
         return super().get_selected_course_id()
 
     def publish_selected_items(self):
         selected_items = self.get_selected_items()
-        for displayed_name in selected_items:
-            self.publish_item_by_displayed_name(displayed_name)
+        selected_objects = self.get_selected_item_objects()
+        course_id = self.loaded_course_id
+        loaded_items = self.loaded_items
+        self.run_bulk_job(self.run_bulk_operation, self.publish_item, course_id, selected_items, selected_objects,
+                          on_done=lambda results: self.finish_publish(course_id, loaded_items, *results))
+
+    def finish_publish(self, course_id, loaded_items, published, failures):
+        if self.is_loaded_list(course_id, loaded_items):
+            for item, updated_item in published:
+                index = self.loaded_items.index(item)
+                self.loaded_items[index] = updated_item
+            self.show_items(self.loaded_items)
+            self.share_loaded_items()
+        elif published:
+            self.reload_changed_items(course_id)
+        self.show_failure_report('Publish', failures)
 
-        self.load_and_sort_items()
-
-    @show_progress_bar
     def download_selected_items(self):
         selected_items = self.get_selected_items()
 
         output_dir = filedialog.askdirectory(initialdir='/', title='Select Folder')
+        if not output_dir:
+            return
+
+        course_id = self.loaded_course_id
+        self.run_bulk_job(self.download_items, course_id, selected_items, output_dir,
+                          on_done=lambda downloaded: self.show_download_summary(downloaded, selected_items,
+                                                                                output_dir))
+
+    def show_download_summary(self, downloaded, selected_items, output_dir):
+        if downloaded < len(selected_items):
+            messagebox.showinfo('Download Canceled',
+                                f'Saved {downloaded} of {len(selected_items)} {self.item_name}(s) to '
+                                f'{Path(output_dir).absolute()} before the download was canceled')
+            return
+        messagebox.showinfo('Download Complete',
+                            f'Finished saving {self.item_name}(s) to {Path(output_dir).absolute()}')
+
+    def download_items(self, job, course_id: int, selected_items, output_dir) -> int:
+        """
+        Download the selected items, stopping early if the job is canceled. Returns the number of items processed.
+        """
+        self.prepare_download(course_id, selected_items)
 
-        for displayed_name in selected_items:
+        for i, displayed_name in enumerate(selected_items):
+            if job.cancelled:
+                return i
             try:
-                self.download_item_by_displayed_name(displayed_name, output_dir)
+                self.download_item(course_id, displayed_name, output_dir)
             except Exception as e:
-                messagebox.showerror('Error',
-                                     f'Error downloading file:'
-                                     f'\n\n{displayed_name}'
-                                     f'\n\nMessage: {e}')
-                continue
-
-        messagebox.showinfo('Download Complete',
-                            f'Finished saving {self.item_name}(s) to {Path(output_dir).absolute()}')
+                self.executor.call_on_main_thread(messagebox.showerror, 'Error',
+                                                  f'Error downloading file:'
+                                                  f'\n\n{displayed_name}'
+                                                  f'\n\nMessage: {e}')
+            job.report_fraction(i + 1, len(selected_items))
+        return len(selected_items)
 
     def delete_selected_items(self):
         selected_items = self.get_selected_items()
+        selected_objects = self.get_selected_item_objects()
+        course_id = self.loaded_course_id
+        loaded_items = self.loaded_items
         ok_delete = self.ask_delete(selected_items)
         if ok_delete:
-            for displayed_name in selected_items:
-                try:
-                    self.delete_item_by_displayed_name(displayed_name)
-                except Unauthorized:
-                    messagebox.showerror('Unauthorized',
-                                         f'User is not authorized to remove {self.item_name}: "{displayed_name}"')
+            self.run_bulk_job(self.run_bulk_operation, self.delete_item, course_id, selected_items, selected_objects,
+                              on_done=lambda results: self.finish_delete(course_id, loaded_items, *results))
+
+    def finish_delete(self, course_id, loaded_items, deleted, failures):
+        if self.is_loaded_list(course_id, loaded_items):
+            for item, _ in deleted:
+                self.remove_loaded_item(item)
+            self.show_items(self.loaded_items)
+            self.share_loaded_items()
+        elif deleted:
+            self.reload_changed_items(course_id)
+        self.show_failure_report('Delete', failures)
+
+    def is_loaded_list(self, course_id, loaded_items) -> bool:
+        """
+        Return whether the loaded list is still the one a bulk operation was started from, so its results can be
+        applied to it.
+        """
+        return course_id == self.loaded_course_id and loaded_items is self.loaded_items
+
+    def reload_changed_items(self, course_id):
+        """
+        Reload the list after a bulk operation changed a course whose list was replaced while the operation ran.
+        """
+        # Listings of courses that are no longer selected aren't kept, so only the selected course needs reloading.
+        if course_id == self.get_selected_course_id():
+            self.course_data.invalidate(self.content_kind)
             self.load_and_sort_items()
 
+    def share_loaded_items(self):
+        # Pass local changes on to other tasks, without them or this task having to list the course again.
+        self.loaded_version = self.course_data.set_items(self.content_kind, self.loaded_course_id, self.loaded_items)
+
+    def run_bulk_job(self, func, *args, on_done):
+        """
+        Run func(job, *args) in the background, keeping the item and Refresh buttons disabled until it finishes, so the
+        same selection can't be submitted again while it runs.
+        """
+        def finish(callback, result):
+            self.bulk_job = None
+            if self.loaded_items:
+                self.enable_buttons()
+            self.update_refresh_btn()
+            callback(result)
+
+        self.disable_buttons()
+        self.refresh_btn.configure(state='disabled')
+        self.bulk_job = self.run_in_background(func, *args,
+                                               on_done=lambda r: finish(on_done, r),
+                                               on_error=lambda e: finish(self.executor.show_error, e))
+
+    def run_bulk_operation(self, job, func, course_id: int, selected_items, selected_objects) -> Tuple[list, list]:
+        """
+        Call func(course_id, displayed_name, item) for every selected item, several at a time.
+
+        Returns the (item, result) pairs that succeeded and the (displayed_name, error) pairs that failed. Items that
+        were not started before the job was canceled are in neither.
+        """
+        succeeded = []
+        failures = []
+        selected = list(zip(selected_items, selected_objects))
+
+        for (displayed_name, item), future in self.csh.map_concurrently(lambda x: func(course_id, *x), selected,
+                                                                        cancel_event=job.cancel_event):
+            try:
+                succeeded.append((item, future.result()))
+            except Exception as e:
+                failures.append((displayed_name, e))
+            job.report_fraction(len(succeeded) + len(failures), len(selected))
+
+        return succeeded, failures
+
+    def show_failure_report(self, operation: str, failures: List[Tuple[str, Exception]]):
+        if not failures:
+            return
+
+        msg = f'Could not {operation.lower()} {len(failures)} {self.item_name}(s):\n'
+        for displayed_name, error in failures[:MAX_LISTED_FAILURES]:
+            if isinstance(error, Unauthorized):
+                error = 'User is not authorized'
+            msg += f'\n{displayed_name}: {error}'
+        if len(failures) > MAX_LISTED_FAILURES:
+            msg += f'\n...and {len(failures) - MAX_LISTED_FAILURES} more'
+        messagebox.showerror(f'{operation} Failed', msg)
+
     def get_selected_items(self):
         selected = []
-        for x in self.item_listbox.curselection():
-            item = self.item_listbox.get(x)
+        for item in self.item_list.get_selected_names():
             item = self.cleanup_displayed_name(item)
             selected.append(item)
         return selected
 
+    def get_selected_item_objects(self):
+        return [self.loaded_items[x] for x in self.item_list.get_selected_indices()]
+
     def get_item_index_by_displayed_name(self, name):
-        index = self.item_listbox.get(0, "end").index(name)
+        index = self.item_list.names.index(name)
         return index
 
     def ask_delete(self, item_list) -> str:
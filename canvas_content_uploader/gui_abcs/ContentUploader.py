@@ -1,20 +1,29 @@
 import tkinter
 from abc import ABC, abstractmethod
+from collections import namedtuple
 from pathlib import Path
-from tkinter import ttk, messagebox, filedialog, simpledialog
-from typing import List
+from tkinter import ttk, messagebox, filedialog
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from typing import TYPE_CHECKING
-import urllib.parse
 
 from canvasapi.exceptions import BadRequest
 
 from canvas_content_uploader.exceptions import UserCanceledUpload
-from canvas_content_uploader.gui_abcs.Task import Task, show_progress_bar
+from canvas_content_uploader.gui_abcs.Task import Task
+from canvas_content_uploader.root_components.BackgroundExecutor import POLL_INTERVAL
+from canvas_content_uploader.root_components.ConflictResolutionDialog import ConflictAction, ConflictResolutionDialog
+from canvas_content_uploader.root_components.UploadEngine import UploadEngine, UploadStatus
 
 if TYPE_CHECKING:
     from canvas_content_uploader.root_components.MasterGui import MasterGui
 
 
+# The number of failed items listed by name in the upload summary.
+MAX_LISTED_FAILURES = 10
+
+UploadPlan = namedtuple('UploadPlan', ['title', 'overwrite'])
+
+
 class ContentUploader(Task, ABC):
     """
     Abstract Base Class used to upload new Canvas content.
@@ -26,6 +35,9 @@ class ContentUploader(Task, ABC):
         self.item_name = item_name
         self.check_for_conflicts = check_for_conflicts
         self.title_required = title_required
+        self.progress_rows = {}
+        self.content_kind = None
+        self.upload_engine: Optional[UploadEngine] = None
 
         self.selected_lbl = ttk.Label(self.frame,
                                       text='Selected files: None', state='disabled')
@@ -47,8 +59,23 @@ class ContentUploader(Task, ABC):
         self.upload_btn.grid(row=1, column=1, padx=5)
         self.overwrite_checkbox.grid(row=1, column=2, padx=5)
 
+        self.progress_frame = ttk.Frame(self.frame)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, mode='determinate', length=300)
+        self.progress_lbl = ttk.Label(self.progress_frame, text='')
+        self.cancel_upload_btn = ttk.Button(self.progress_frame, text='Cancel', state='disabled')
+        self.progress_tree = ttk.Treeview(self.progress_frame, columns=('status',), height=6)
+        self.progress_tree.heading('#0', text=self.item_name)
+        self.progress_tree.heading('status', text='Status')
+        self.progress_tree.column('status', width=90, stretch=False)
+
+        self.progress_bar.grid(row=0, column=0, sticky='EW', padx=5, pady=2.5)
+        self.progress_lbl.grid(row=1, column=0, sticky='W', padx=5)
+        self.cancel_upload_btn.grid(row=0, column=1, rowspan=2, padx=5)
+        self.progress_tree.grid(row=2, column=0, sticky='EW', padx=5, pady=2.5)
+
+    # get_existing_item_titles_as_list, get_existing_item_hashes and get_item_hash are called from a background thread.
     @abstractmethod
-    def get_existing_item_titles_as_list(self) -> list:
+    def get_existing_item_titles_as_list(self, course_id: int) -> list:
         pass
 
     @abstractmethod
@@ -59,20 +86,26 @@ class ContentUploader(Task, ABC):
     def handle_course_change(self):
         pass
 
-    @show_progress_bar
+    # upload_item_to_course and overwrite_item are called from upload worker threads,
+    # so implementations must not touch any widgets.
     @abstractmethod
-    def upload_item_to_course(self, item):
+    def upload_item_to_course(self, item, course_id: int, progress_callback: Callable[[int], None] = None):
         pass
 
-    @show_progress_bar
     @abstractmethod
-    def overwrite_item(self, title: str, new_item):
+    def overwrite_item(self, title: str, new_item, course_id: int):
         pass
 
     @abstractmethod
     def get_title_from_file_path(self, file_path: Path) -> str:
         pass
 
+    def get_existing_item_hashes(self, titles: Set[str]) -> dict:
+        return {}
+
+    def get_item_hash(self, file_path: Path) -> str:
+        pass
+
     def enable_selection(self):
         self.browse_btn.configure(state='active')
         self.selected_lbl.configure(state='active')
@@ -84,94 +117,211 @@ class ContentUploader(Task, ABC):
         return super().get_selected_course_id()
 
     def upload_btn_callback(self):
-        existing_titles = self.get_existing_item_titles_as_list()
-        force_overwrite = self.overwrite_checkbox_var.get()
-
-        for path in self.queued_files:
-            path
-            try:
-                if self.check_for_conflicts:
-                    self.upload_item_with_conflict_check(existing_titles, force_overwrite, path)
-                else:
-                    self.upload_item_without_conflict_check(path)
-            except UserCanceledUpload:
-                continue
-            except BadRequest as e:
-                if '"message":"too_long"' in e.message:
-                    messagebox.showerror('Body Too Long',
-                                         f'The following file is too large to upload:'
-                                         f'\n\n{path}')
-                    continue
-
-            except Exception as e:
-                messagebox.showerror('Error',
-                                     f'Error uploading file:'
-                                     f'\n\n{path}'
-                                     f'\n\nMessage: {e}')
-
-        messagebox.showinfo('Upload Complete',
-                            f'Finished uploading {self.item_name}(s)')
+        force_overwrite = self.overwrite_checkbox_var.get() == 1
+        # Conflicts are checked against, and files uploaded to, the course selected when the upload was started.
+        course_id = self.get_selected_course_id()
+        paths = list(self.queued_files)
+
+        self.browse_btn.configure(state='disabled')
+        self.upload_btn.configure(state='disabled')
+        self.run_in_background(self.get_existing_items, course_id, paths, force_overwrite,
+                               on_done=lambda existing: self.start_uploads(existing, course_id, paths,
+                                                                           force_overwrite),
+                               on_error=self.handle_planning_error)
+
+    def get_existing_items(self, job, course_id: int, paths: List[Path],
+                           force_overwrite: bool) -> Optional[Tuple[Set[str], Set[Path]]]:
+        """
+        Fetch the titles of existing items that the queued files may conflict with, and when overwriting, find the
+        queued files whose content matches the item they would overwrite.
+
+        Returns None if the job was canceled.
+        """
+        if not self.check_for_conflicts:
+            return set(), set()
+
+        existing_titles = set(self.get_existing_item_titles_as_list(course_id))
+        unchanged = set()
+        if force_overwrite:
+            # Only the existing items that a queued file would overwrite are fetched and hashed.
+            titles = {self.get_title_from_file_path(x) for x in paths} & existing_titles
+            existing_hashes = self.get_existing_item_hashes(titles)
+            for path in paths:
+                if job.cancelled:
+                    break
+                title = self.get_title_from_file_path(path)
+                if title in existing_hashes and self.get_item_hash(path) == existing_hashes[title]:
+                    unchanged.add(path)
+
+        if job.cancelled:
+            return None
+        return existing_titles, unchanged
+
+    def handle_planning_error(self, e: Exception):
+        self.browse_btn.configure(state='active')
+        self.update_widgets()
+        self.executor.show_error(e)
+
+    def start_uploads(self, existing: Optional[Tuple[Set[str], Set[Path]]], course_id: int, paths: List[Path],
+                      force_overwrite: bool):
+        try:
+            if existing is None:
+                raise UserCanceledUpload
+            existing_titles, unchanged = existing
+            plans, skipped = self.plan_uploads(paths, existing_titles, unchanged, force_overwrite)
+        except UserCanceledUpload:
+            self.browse_btn.configure(state='active')
+            self.update_widgets()
+            return
+
+        engine = UploadEngine(lambda path, progress: self.upload_planned_item(path, plans[path], course_id, progress),
+                              self.csh.max_concurrent_uploads)
+        items = [x for x in paths if x in plans]
+
+        self.show_upload_progress(items)
+        self.cancel_upload_btn.configure(state='active', command=lambda: self.cancel_uploads(engine))
+        self.upload_engine = engine
+        engine.start(items)
+        self.poll_upload_progress(engine, skipped)
+
+    def poll_upload_progress(self, engine: UploadEngine, skipped: int):
+        running = engine.is_running()
+        self.update_upload_progress(engine)
+        if running:
+            self.frame.after(POLL_INTERVAL, self.poll_upload_progress, engine, skipped)
+            return
+
+        self.upload_engine = None
+        self.browse_btn.configure(state='active')
+        self.cancel_upload_btn.configure(state='disabled')
+        if self.content_kind and engine.completed > len(engine.failures) + engine.canceled:
+            self.course_data.invalidate(self.content_kind)
+        self.show_upload_summary(engine, skipped)
         self.queued_files: List['Path'] = []
         self.update_widgets()
 
-    def upload_item_without_conflict_check(self, path: Path):
-        if self.title_required:
-            title = self.get_title_from_file_path(path)
-            item = self.prepare_item_with_title(path, title)
-        else:
-            item = path
-        self.upload_item_to_course(item)
+    def close(self):
+        if self.upload_engine:
+            self.upload_engine.cancel()
 
-    def upload_item_with_conflict_check(self, existing_titles: List[str], force_overwrite: bool, item):
-        title = self.get_title_from_file_path(item)
-        if force_overwrite == 1:
-            overwrite = True
-        else:
-            overwrite = False
-        if title in existing_titles:
-            name_conflict = True
-        else:
-            name_conflict = False
-        while name_conflict:
-            if title not in existing_titles or overwrite:
-                break
+    def cancel_uploads(self, engine: UploadEngine):
+        self.cancel_upload_btn.configure(state='disabled')
+        engine.cancel()
+
+    def plan_uploads(self, paths: List[Path], existing_titles: Set[str], unchanged: Set[Path],
+                     force_overwrite: bool) -> Tuple[Dict[Path, UploadPlan], int]:
+        """
+        Decide the title of every queued file and whether it overwrites an existing item, before anything is uploaded.
 
-            rename = self.ask_rename_item(title)
+        Returns the plan for each file to upload, and the number of files skipped. Files in unchanged are skipped. All
+        title conflicts are resolved in a single dialog. Raises UserCanceledUpload if that dialog is canceled.
+        """
+        if not self.check_for_conflicts:
+            return {x: UploadPlan(None, False) for x in paths}, 0
 
-            if rename == 'yes':
-                title = simpledialog.askstring(f'Rename {self.item_name}', 'New Title:')
-            elif rename == 'no':
-                overwrite = self.prompt_ask_overwrite(title)
+        plans = {}
+        taken_titles = set()
+        conflicts = []
+        skipped = 0
+
+        for path in paths:
+            title = self.get_title_from_file_path(path)
+            if path in unchanged:
+                skipped += 1
+            elif title in taken_titles or (title in existing_titles and not force_overwrite):
+                conflicts.append((path, title))
             else:
+                plans[path] = UploadPlan(title, title in existing_titles)
+                taken_titles.add(title)
+
+        if conflicts:
+            dialog = ConflictResolutionDialog(self.frame, self.item_name, conflicts, existing_titles, taken_titles)
+            resolutions = dialog.show()
+            if resolutions is None:
                 raise UserCanceledUpload
-        item = self.prepare_item_with_title(item, title)
-        if overwrite and title in existing_titles:
-            self.overwrite_item(title, item)
+
+            for path, (action, title) in resolutions.items():
+                if action == ConflictAction.SKIP:
+                    skipped += 1
+                else:
+                    plans[path] = UploadPlan(title, action == ConflictAction.OVERWRITE)
+
+        return plans, skipped
+
+    def upload_planned_item(self, path: Path, plan: UploadPlan, course_id: int,
+                            progress_callback: Callable[[int], None] = None):
+        if not self.title_required:
+            self.upload_item_to_course(path, course_id, progress_callback)
+            return
+
+        item = self.prepare_item_with_title(path, plan.title)
+        if plan.overwrite:
+            self.overwrite_item(plan.title, item, course_id)
         else:
-            self.upload_item_to_course(item)
-        existing_titles.append(title)
+            self.upload_item_to_course(item, course_id, progress_callback)
+
+    def show_upload_progress(self, items: List[Path]):
+        self.progress_tree.delete(*self.progress_tree.get_children())
+        self.progress_rows = {}
+        for item in items:
+            self.progress_rows[item] = self.progress_tree.insert('', 'end', text=item.name,
+                                                                 values=(UploadStatus.QUEUED.value,))
+        self.progress_bar.configure(value=0, maximum=100)
+        self.progress_lbl.configure(text='')
+        self.progress_frame.grid(row=2, column=0, columnspan=3, sticky='EW', pady=5)
+
+    def update_upload_progress(self, engine: UploadEngine):
+        for event in engine.get_events():
+            self.progress_tree.set(self.progress_rows[event.item], 'status', event.status.value)
+
+        for item, row in self.progress_rows.items():
+            if self.progress_tree.set(row, 'status').startswith(UploadStatus.UPLOADING.value):
+                percent = engine.get_item_progress(item) * 100
+                self.progress_tree.set(row, 'status', f'{UploadStatus.UPLOADING.value} {percent:.0f}%')
+
+        percent = engine.bytes_done / engine.total_bytes * 100 if engine.total_bytes else 0
+        mb_per_second = engine.get_throughput() / 1024 ** 2
+        self.progress_bar.configure(value=percent)
+
+        msg = (f'{engine.completed} of {len(engine.items)} {self.item_name}(s) finished, '
+               f'{percent:.0f}% ({mb_per_second:.2f} MB/s)')
+        seconds_remaining = engine.get_seconds_remaining()
+        if seconds_remaining is not None and engine.is_running():
+            minutes, seconds = divmod(int(seconds_remaining), 60)
+            msg += f', about {minutes}:{seconds:02d} left'
+        self.progress_lbl.configure(text=msg)
+
+    def show_upload_summary(self, engine: UploadEngine, skipped=0):
+        uploaded = engine.completed - len(engine.failures) - engine.canceled
+        msg = (f'Finished uploading {self.item_name}(s)'
+               f'\n\nUploaded: {uploaded}'
+               f'\nSkipped: {skipped}'
+               f'\nFailed: {len(engine.failures)}')
+        if engine.canceled:
+            msg += f'\nCanceled: {engine.canceled}'
+
+        if not engine.failures:
+            messagebox.showinfo('Upload Complete', msg)
+            return
+
+        msg += '\n'
+        for item, error in engine.failures[:MAX_LISTED_FAILURES]:
+            msg += f'\n{item.name}: {self.describe_upload_error(error)}'
+        if len(engine.failures) > MAX_LISTED_FAILURES:
+            msg += f'\n...and {len(engine.failures) - MAX_LISTED_FAILURES} more'
+        messagebox.showwarning('Upload Complete', msg)
+
+    @staticmethod
+    def describe_upload_error(error: Exception) -> str:
+        if isinstance(error, BadRequest) and '"message":"too_long"' in error.message:
+            return 'File is too large to upload'
+        return str(error)
 
     def browse_btn_callback(self):
         selected_files = self.prompt_files()
         self.queued_files = [Path(x) for x in selected_files]
         self.update_widgets()
 
-    def prompt_ask_overwrite(self, title: str) -> str:
-        r = messagebox.askokcancel('Overwrite Page',
-                                   message=f'Are you sure you wish to overwrite the following {self.item_name}?'
-                                           f'\n\n"{title}"',
-                                   icon='warning')
-        return r
-
-    def ask_rename_item(self, title) -> str:
-        r = messagebox.showwarning('Conflicting Title',
-                                   f'WARNING: A {self.item_name} with the following title already exists:\n\n'
-                                   f'"{title}"\n\n'
-                                   'Rename file before uploading? \n\n'
-                                   f'(Selecting "No" will OVERWRITE the existing {self.item_name}.)',
-                                   type='yesnocancel')
-        return r
-
     def prompt_files(self):
         if self.browse_file_types:
             files = filedialog.askopenfilename(multiple=True,
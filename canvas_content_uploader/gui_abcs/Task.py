@@ -1,36 +1,14 @@
-import threading
-import time
 from abc import ABC, abstractmethod
 from tkinter import ttk
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable
+
+from canvas_content_uploader.root_components.BackgroundExecutor import BackgroundJob
 
 if TYPE_CHECKING:
     from root_components.MasterGui import MasterGui
     from root_components.CanvasSessionHandler import CanvasSessionHandler
 
 
-# Progress bar decorator
-def show_progress_bar(func):
-    def wrapper(*args):
-        self = args[0]
-        pb = ttk.Progressbar(self.frame, mode='indeterminate', length=50)
-        pb.grid(sticky='SWE', columnspan=5, padx=5, pady=5)
-        try:
-            pb.start()
-            pb.update()
-            t = threading.Thread(target=func, args=(*args,))
-            t.start()
-
-            while t.is_alive():
-                pb.update()
-                pb.step(5)
-                time.sleep(.05)
-
-        finally:
-            pb.destroy()
-    return wrapper
-
-
 class Task(ABC):
     """
     Abstract Base Class used to build GUI components for Canvas operations.
@@ -38,13 +16,18 @@ class Task(ABC):
     def __init__(self, master_gui: 'MasterGui'):
         self.csh: 'CanvasSessionHandler' = master_gui.csh
         self.master_gui = master_gui
+        self.executor = master_gui.executor
+        self.course_data = master_gui.course_data
         self.course_var = master_gui.selected_course_combo_var
         self.selected_course_combo_var = master_gui.selected_course_combo_var
         self.selected_course_id_var = master_gui.selected_course_id_var
         self.frame = ttk.Frame(master_gui.task_frame)
 
     def grid(self):
-        self.frame.grid()
+        self.frame.grid(row=0, column=0)
+
+    def grid_remove(self):
+        self.frame.grid_remove()
 
     @abstractmethod
     def enable_selection(self):
@@ -54,5 +37,49 @@ class Task(ABC):
     def handle_course_change(self):
         pass
 
+    def close(self):
+        """
+        Stop any work the task runs outside the background executor, before the window is closed.
+        """
+        pass
+
     def get_selected_course_id(self) -> int:
         return self.selected_course_id_var.get()
+
+    def run_in_background(self, func: Callable, *args, on_done: Callable = None, on_error: Callable = None,
+                          on_progress: Callable = None) -> BackgroundJob:
+        """
+        Run func(job, *args) on the background executor, showing a progress bar and cancel button until it finishes.
+
+        The progress bar is indeterminate until the job calls job.report_fraction.
+        """
+        progress_frame = ttk.Frame(self.frame)
+        pb = ttk.Progressbar(progress_frame, mode='indeterminate', length=50)
+        cancel_btn = ttk.Button(progress_frame, text='Cancel')
+        pb.grid(row=0, column=0, sticky='EW')
+        cancel_btn.grid(row=0, column=1, padx=5)
+        progress_frame.columnconfigure(0, weight=1)
+        progress_frame.grid(sticky='SWE', columnspan=5, padx=5, pady=5)
+        pb.start()
+
+        def show_fraction(done, total):
+            pb.stop()
+            pb.configure(mode='determinate', maximum=max(1, total), value=done)
+
+        def finish(callback, result):
+            progress_frame.destroy()
+            if callback:
+                callback(result)
+
+        job = self.executor.submit(func, *args,
+                                   on_done=lambda r: finish(on_done, r),
+                                   on_error=lambda e: finish(on_error or self.executor.show_error, e),
+                                   on_progress=on_progress,
+                                   on_fraction=show_fraction)
+
+        def cancel():
+            cancel_btn.configure(state='disabled')
+            job.cancel()
+
+        cancel_btn.configure(command=cancel)
+        return job
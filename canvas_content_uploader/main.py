@@ -12,10 +12,25 @@ config.read(config_path)
 CANVAS_URL = config['DEFAULT']['canvas_url']
 WINDOW_TITLE = config['DEFAULT']['window_title']
 ICON_PATH = config['DEFAULT']['icon_path']
+MAX_UPLOAD_RATE = config['DEFAULT'].get('max_upload_bytes_per_second', fallback='').strip()
+
+SESSION_OPTIONS = {
+    'max_concurrency': config['DEFAULT'].getint('max_concurrent_requests', fallback=8),
+    'page_cache_path': config['DEFAULT'].get('page_cache_path', fallback=''),
+    'page_cache_max_bytes': config['DEFAULT'].getint('page_cache_size_mb', fallback=200) * 1024 ** 2,
+    'page_index_path': config['DEFAULT'].get('page_index_path', fallback=''),
+    'page_index_max_bytes': config['DEFAULT'].getint('page_index_size_mb', fallback=100) * 1024 ** 2,
+    'connect_timeout': config['DEFAULT'].getfloat('connect_timeout', fallback=10),
+    'read_timeout': config['DEFAULT'].getfloat('read_timeout', fallback=60),
+    'max_concurrent_uploads': config['DEFAULT'].getint('max_concurrent_uploads', fallback=4),
+    'max_upload_bytes_per_second': int(MAX_UPLOAD_RATE) if MAX_UPLOAD_RATE else None,
+    'prefetch_page_bodies': config['DEFAULT'].getboolean('prefetch_page_bodies', fallback=False),
+    'inventory_backend': config['DEFAULT'].get('inventory_backend', fallback='rest').strip().lower() or 'rest',
+}
 
 
 def main():
-    g = MasterGui(canvas_url=CANVAS_URL, title=WINDOW_TITLE, icon_path=ICON_PATH)
+    g = MasterGui(canvas_url=CANVAS_URL, title=WINDOW_TITLE, icon_path=ICON_PATH, session_options=SESSION_OPTIONS)
     g.run()
 
 
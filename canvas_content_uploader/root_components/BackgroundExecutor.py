@@ -0,0 +1,133 @@
+import queue
+import sys
+import threading
+import tkinter
+from concurrent.futures import Future, ThreadPoolExecutor
+from tkinter import messagebox
+from typing import Callable
+
+# How often the Tk main loop checks for events posted by worker threads, in milliseconds.
+POLL_INTERVAL = 50
+
+
+class BackgroundJob:
+    """
+    Handle for work submitted to a BackgroundExecutor.
+
+    The worker uses it to report progress and check for cancellation, and the GUI uses it to cancel the work.
+    """
+    def __init__(self, executor: 'BackgroundExecutor', on_progress: Callable = None, on_fraction: Callable = None):
+        self.cancel_event = threading.Event()
+        self.on_progress = on_progress
+        self.on_fraction = on_fraction
+        self.__executor = executor
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def report_progress(self, *args):
+        if self.on_progress:
+            self.__executor.post(self.on_progress, *args)
+
+    def report_fraction(self, done: int, total: int):
+        if self.on_fraction:
+            self.__executor.post(self.on_fraction, done, total)
+
+
+class BackgroundExecutor:
+    """
+    Run work on background threads, passing its progress and results back to the Tk main loop through a queue.
+
+    Worker threads never call Tk themselves. Every callback is queued and then run on the main thread by a root.after
+    poll, so the GUI stays responsive while the work runs.
+    """
+    def __init__(self, root: tkinter.Tk, max_workers=4):
+        self.root = root
+        self.__events = queue.Queue()
+        self.__pool = ThreadPoolExecutor(max_workers=max_workers)
+        self.__jobs = set()
+        self.__jobs_lock = threading.Lock()
+        self.__shut_down = False
+        self.root.after(POLL_INTERVAL, self.__drain)
+
+    def submit(self, func: Callable, *args, on_done: Callable = None, on_error: Callable = None,
+               on_progress: Callable = None, on_fraction: Callable = None) -> BackgroundJob:
+        """
+        Call func(job, *args) on a worker thread, then on_done(result) or on_error(exception) on the main thread.
+        """
+        job = BackgroundJob(self, on_progress=on_progress, on_fraction=on_fraction)
+        on_error = on_error or self.show_error
+
+        def run():
+            try:
+                if self.__shut_down:
+                    return
+                result = func(job, *args)
+            except Exception as e:
+                self.post(on_error, e)
+            else:
+                if on_done:
+                    self.post(on_done, result)
+            finally:
+                with self.__jobs_lock:
+                    self.__jobs.discard(job)
+
+        with self.__jobs_lock:
+            self.__jobs.add(job)
+        self.__pool.submit(run)
+        return job
+
+    def shutdown(self):
+        """
+        Cancel every job, so running jobs stop at their next check and queued jobs never start.
+        """
+        self.__shut_down = True
+        with self.__jobs_lock:
+            for job in self.__jobs:
+                job.cancel()
+        self.__pool.shutdown(wait=False)
+
+    def post(self, func: Callable, *args):
+        self.__events.put((func, args))
+
+    def call_on_main_thread(self, func: Callable, *args):
+        """
+        Call func on the Tk main thread, such as to show a dialog, and wait for its result. Only call from workers.
+        """
+        future = Future()
+
+        def run():
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        self.post(run)
+        return future.result()
+
+    @staticmethod
+    def show_error(e: Exception):
+        messagebox.showerror('Error', f'Message: {e}')
+
+    def __drain(self):
+        try:
+            while True:
+                try:
+                    func, args = self.__events.get_nowait()
+                except queue.Empty:
+                    break
+
+                try:
+                    func(*args)
+                except tkinter.TclError:
+                    # The widgets the job was started from may have been destroyed while it ran.
+                    pass
+                except Exception:
+                    # Report the error without dropping the callbacks queued after it.
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self.root.after(POLL_INTERVAL, self.__drain)
@@ -0,0 +1,140 @@
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import requests
+
+from canvas_content_uploader.exceptions import GraphQLQueryFailed
+
+# The largest number of nodes Canvas returns for one page of a GraphQL connection.
+MAX_NODES_PER_QUERY = 100
+
+PAGES_QUERY = '''
+query CoursePages($courseId: ID!, $after: String, $includeBody: Boolean!) {
+  course(id: $courseId) {
+    pagesConnection(first: %d, after: $after) {
+      nodes {
+        _id
+        title
+        url
+        published
+        createdAt
+        updatedAt
+        body @include(if: $includeBody)
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+    }
+  }
+}
+''' % MAX_NODES_PER_QUERY
+
+FILES_QUERY = '''
+query CourseFiles($courseId: ID!, $after: String) {
+  course(id: $courseId) {
+    filesConnection(first: %d, after: $after) {
+      nodes {
+        _id
+        displayName
+        size
+        url
+        createdAt
+        updatedAt
+        folder {
+          _id
+        }
+      }
+      pageInfo {
+        hasNextPage
+        endCursor
+      }
+    }
+  }
+}
+''' % MAX_NODES_PER_QUERY
+
+
+class CanvasGraphQLClient:
+    """
+    List a course's pages and files through Canvas's GraphQL API, a hundred at a time, in the REST API's JSON format.
+
+    Pages can be listed with their bodies, so a course with hundreds of pages is fetched in a few queries rather than
+    one request per page.
+    """
+    def __init__(self, graphql_url: str, session: requests.Session, token: str):
+        self.graphql_url = graphql_url
+        self.session = session
+        self.token = token
+
+    def query(self, query: str, variables: dict) -> dict:
+        response = self.session.post(self.graphql_url, json={'query': query, 'variables': variables},
+                                     headers={'Authorization': f'Bearer {self.token}'})
+        response.raise_for_status()
+        result = response.json()
+        if result.get('errors'):
+            raise GraphQLQueryFailed(result['errors'])
+        return result['data']
+
+    def get_connection_nodes(self, query: str, variables: dict, connection: str,
+                             cancel_event: threading.Event = None) -> List[dict]:
+        """
+        Return every node of one of a course's connections, following its cursor from page to page.
+        """
+        nodes = []
+        after = None
+        while cancel_event is None or not cancel_event.is_set():
+            data = self.query(query, {**variables, 'after': after})
+            if not data.get('course'):
+                # Courses the user can't see are missing rather than errors, so the listing can still be retried.
+                raise ValueError(f'Course {variables["courseId"]} was not found')
+
+            page = data['course'][connection]
+            nodes.extend(page['nodes'])
+            if not page['pageInfo']['hasNextPage']:
+                break
+            after = page['pageInfo']['endCursor']
+        return nodes
+
+    def get_course_pages(self, course_id: int, include_body=False, cancel_event: threading.Event = None) -> List[dict]:
+        nodes = self.get_connection_nodes(PAGES_QUERY, {'courseId': str(course_id), 'includeBody': include_body},
+                                          'pagesConnection', cancel_event=cancel_event)
+        pages = []
+        for x in nodes:
+            page = {'page_id': int(x['_id']),
+                    'title': x['title'],
+                    'url': x['url'],
+                    'published': x['published'],
+                    'created_at': self.to_rest_timestamp(x['createdAt']),
+                    'updated_at': self.to_rest_timestamp(x['updatedAt'])}
+            if include_body:
+                page['body'] = x['body']
+            pages.append(page)
+        return pages
+
+    def get_course_files(self, course_id: int, cancel_event: threading.Event = None) -> List[dict]:
+        nodes = self.get_connection_nodes(FILES_QUERY, {'courseId': str(course_id)}, 'filesConnection',
+                                          cancel_event=cancel_event)
+        files = []
+        for x in nodes:
+            files.append({'id': int(x['_id']),
+                          'display_name': x['displayName'],
+                          'size': x['size'],
+                          'url': x['url'],
+                          'folder_id': int(x['folder']['_id']) if x.get('folder') else None,
+                          'created_at': self.to_rest_timestamp(x['createdAt']),
+                          'modified_at': self.to_rest_timestamp(x['updatedAt'])})
+        return files
+
+    @staticmethod
+    def to_rest_timestamp(value: Optional[str]) -> Optional[str]:
+        """
+        Convert a GraphQL timestamp, which carries a time zone offset, to the UTC format used by the REST API.
+
+        Listings are sorted and cached by these strings, so both APIs must format the same time the same way.
+        """
+        if not value:
+            return value
+        timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return timestamp.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
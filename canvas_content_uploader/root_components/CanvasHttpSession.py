@@ -0,0 +1,55 @@
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from canvas_content_uploader.root_components.RequestThrottle import RequestThrottle
+
+# Requests rejected by Canvas's rate limiter are retried after RETRY_DELAY * attempt seconds.
+MAX_RETRIES = 3
+RETRY_DELAY = 1.0
+
+# Canvas redirects some requests to other hosts (such as file storage), so keep a pool for a few hosts.
+POOL_HOSTS = 4
+
+
+class CanvasHttpSession(requests.Session):
+    """
+    HTTP session used by the canvasapi requester, which sends every Canvas API request through a shared throttle.
+
+    Each host gets a keep-alive connection pool sized to the throttle's maximum limit, or to pool_size. Worker threads
+    block waiting for a pooled connection instead of opening (and then discarding) extra ones, so one session can be
+    shared by every worker thread. Without a throttle, such as for requests to Canvas's file storage service, which
+    isn't rate limited by Canvas, requests are only pooled.
+    """
+    def __init__(self, throttle: Optional[RequestThrottle], connect_timeout: float = None, read_timeout: float = None,
+                 pool_size: int = None):
+        super().__init__()
+        self.throttle = throttle
+        self.timeout = (connect_timeout, read_timeout)
+
+        pool_size = pool_size or throttle.max_limit
+        adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=pool_size, pool_block=True)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method, url, *args, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        if self.throttle is None:
+            return super().request(method, url, *args, **kwargs)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            response = None
+            self.throttle.acquire()
+            try:
+                response = super().request(method, url, *args, **kwargs)
+            finally:
+                self.throttle.release(response)
+
+            if attempt > MAX_RETRIES or not self.throttle.is_rate_limited(response):
+                return response
+
+            time.sleep(RETRY_DELAY * attempt)
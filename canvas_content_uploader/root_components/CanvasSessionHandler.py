@@ -1,32 +1,117 @@
+import hashlib
+import logging
+import math
 import re
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from pathlib import Path
-from typing import Iterable, List, Union
+from typing import Iterable, List, Optional, Union
 
 import canvasapi
 import canvasapi.course
 import canvasapi.file
 import canvasapi.page
+import requests
+from canvasapi.util import combine_kwargs
+
+from canvas_content_uploader.exceptions import GraphQLQueryFailed
+from canvas_content_uploader.root_components.CanvasGraphQLClient import CanvasGraphQLClient
+from canvas_content_uploader.root_components.CanvasHttpSession import CanvasHttpSession
+from canvas_content_uploader.root_components.PageBodyCache import PageBodyCache
+from canvas_content_uploader.root_components.PageSearchIndex import PageSearchIndex
+from canvas_content_uploader.root_components.RequestThrottle import RequestThrottle
+from canvas_content_uploader.root_components.SingleFlight import SingleFlight
+from canvas_content_uploader.root_components.StreamingUpload import BandwidthLimiter, MultipartFileStream
+
+logger = logging.getLogger(__name__)
+
+# The largest page size Canvas allows for paginated listings.
+MAX_PER_PAGE = 100
+
+# The number of seconds a fetched course object is reused before it is fetched again.
+COURSE_CACHE_TTL = 300
+
+# The number of pages collected before writing them to the page cache or the search index in one transaction.
+WRITE_BATCH_SIZE = 200
+
+# Elements whose whitespace is shown as is, so it is kept when comparing page bodies.
+PREFORMATTED_PATTERN = re.compile(r'(<(?:pre|textarea)\b.*?</(?:pre|textarea)\s*>)', re.IGNORECASE | re.DOTALL)
+
+# Whitespace next to the tags of block elements is never shown.
+BLOCK_TAG_PATTERN = re.compile(r'\s*(</?(?:address|article|aside|blockquote|br|dd|div|dl|dt|figcaption|figure|footer|'
+                               r'h[1-6]|header|hr|li|main|nav|ol|p|section|table|tbody|td|tfoot|th|thead|tr|ul)\b'
+                               r'[^>]*>)\s*', re.IGNORECASE)
+
+# How often, in seconds, a concurrent fan-out checks whether it was canceled while waiting on its calls.
+CANCEL_CHECK_INTERVAL = .1
+
+# The APIs that course page and file listings can be fetched with. GraphQL listings fall back to REST if they fail.
+INVENTORY_BACKENDS = ('rest', 'graphql')
 
 
 class CanvasSessionHandler:
     """
     Create Canvas session and handle Canvas API calls.
     """
-    def __init__(self, url):
+    def __init__(self, url, max_concurrency=8, page_cache_path: Path = None, page_cache_max_bytes=200 * 1024 ** 2,
+                 page_index_path: Path = None, page_index_max_bytes=100 * 1024 ** 2, connect_timeout: float = None,
+                 read_timeout: float = None,
+                 course_cache_ttl=COURSE_CACHE_TTL, max_concurrent_uploads=4,
+                 max_upload_bytes_per_second: int = None, prefetch_page_bodies=False, inventory_backend='rest'):
+        if inventory_backend not in INVENTORY_BACKENDS:
+            raise ValueError(f'Unknown inventory backend {inventory_backend!r}, expected one of {INVENTORY_BACKENDS}')
+
         self.url = url
         self.token = None
+        self.max_concurrency = max(1, max_concurrency)
+        self.throttle = RequestThrottle(self.max_concurrency)
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.course_cache_ttl = course_cache_ttl
+        self.max_concurrent_uploads = max(1, max_concurrent_uploads)
+        self.upload_limiter = BandwidthLimiter(max_upload_bytes_per_second) if max_upload_bytes_per_second else None
+        # File contents are sent to Canvas's storage service, which the API rate limit doesn't cover.
+        self.storage_session = CanvasHttpSession(None, connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                                 pool_size=self.max_concurrent_uploads)
+        self.prefetch_page_bodies = prefetch_page_bodies
+        self.inventory_backend = inventory_backend
+        self.graphql: Optional[CanvasGraphQLClient] = None
+        self.disabled_graphql_listings = set()
+        self.__courses = {}
+        self.__single_flight = SingleFlight()
+        self.page_cache = PageBodyCache(page_cache_path, page_cache_max_bytes) if page_cache_path else None
+        self.search_index = PageSearchIndex(page_index_path, page_index_max_bytes) if page_index_path else None
         self.__session: canvasapi.Canvas = None
 
     def login(self):
         self.__session = canvasapi.Canvas(self.url, self.token)
-
-    def get_course_url(self, course_id: int) -> str:
+        # Every canvasapi object shares the Canvas object's requester, so replacing its HTTP session
+        # sends all Canvas API traffic through the throttle.
+        self.__requester._session = CanvasHttpSession(self.throttle,
+                                                      connect_timeout=self.connect_timeout,
+                                                      read_timeout=self.read_timeout)
+        if self.inventory_backend == 'graphql':
+            self.graphql = CanvasGraphQLClient(f'{self.get_base_url()}/api/graphql', self.__requester._session,
+                                               self.token)
+            self.disabled_graphql_listings.clear()
+        self.invalidate_course_cache()
+
+    @property
+    def __requester(self):
+        return self.__session._Canvas__requester
+
+    def get_base_url(self) -> str:
         base_url = self.url
 
         if base_url.endswith('/'):
             base_url = base_url[:-1]
+        return base_url
 
-        course_url = f'{base_url}/courses/{course_id}'
+    def get_course_url(self, course_id: int) -> str:
+        course_url = f'{self.get_base_url()}/courses/{course_id}'
         return course_url
 
     def get_page(self, course: Union[int, canvasapi.course.Course], page_url: str) -> canvasapi.page.Page:
@@ -39,10 +124,27 @@ class CanvasSessionHandler:
 
     @staticmethod
     def get_page_content(page: canvasapi.page.Page) -> str:
+        if hasattr(page, 'body'):
+            return page.body
         r = page.show_latest_revision()
         content = r.body
         return content
 
+    @staticmethod
+    def get_body_hash(body: str) -> str:
+        """
+        Hash a page body, ignoring the whitespace changes Canvas makes to saved bodies where they don't change how the
+        page renders.
+
+        Runs of whitespace are collapsed to one space, and whitespace next to block element tags is dropped. Whitespace
+        inside pre and textarea elements is kept exactly, as is the single space between inline elements.
+        """
+        parts = PREFORMATTED_PATTERN.split(body or '')
+        for i in range(0, len(parts), 2):
+            parts[i] = BLOCK_TAG_PATTERN.sub(r'\1', re.sub(r'\s+', ' ', parts[i]))
+        body = ''.join(parts).strip()
+        return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
     def get_page_url(self, course_id: int, page_short_url: str) -> str:
         course_url = self.get_course_url(course_id)
         page_url = f'{course_url}/pages/{page_short_url}'
@@ -54,98 +156,208 @@ class CanvasSessionHandler:
         return file_url
 
     def get_course(self, course_id: int) -> canvasapi.course.Course:
-        course = self.__session.get_course(course_id)
+        key = str(course_id).strip()
+        cached = self.__courses.get(key)
+        if cached and time.monotonic() - cached[1] < self.course_cache_ttl:
+            return cached[0]
+
+        course = self.__single_flight.do(('course', key), self.__session.get_course, course_id)
+        self.__courses[key] = (course, time.monotonic())
         return course
 
-    def get_enrolled_courses(self):
-        courses = self.__session.get_courses()
-        return courses
+    def invalidate_course_cache(self, course_id: int = None):
+        if course_id is None:
+            self.__courses.clear()
+        else:
+            self.__courses.pop(str(course_id).strip(), None)
+
+    def get_enrolled_courses(self) -> List[canvasapi.course.Course]:
+        courses = self.__single_flight.do(('courses',), self.list_paginated, 'courses', canvasapi.course.Course)
+        return list(courses)
 
     def add_page_to_course(self, page_dict: dict, course_id: int):
         course = self.get_course(course_id)
         course.create_page(page_dict)
 
-    def upload_file_to_course(self, file: Path, course_id: int):
-        course = self.get_course(course_id)
-        course.upload(file.as_posix())
+    def upload_file_to_course(self, file: Path, course_id: int, progress_callback=None) -> dict:
+        # Canvas uploads take three steps: ask Canvas where to send the file, send it there,
+        # then confirm the upload with Canvas if the storage service redirects back to it.
+        response = self.__requester.request('POST', f'courses/{course_id}/files',
+                                            name=file.name, size=file.stat().st_size)
+        upload = response.json()
+
+        with MultipartFileStream(file, upload['upload_params'], progress_callback, self.upload_limiter) as stream:
+            response = self.storage_session.post(upload['upload_url'], data=stream,
+                                                 headers={'Content-Type': stream.content_type}, allow_redirects=False)
+
+        if response.is_redirect:
+            response = self.__requester.request('GET', _url=response.headers['Location'])
+        response.raise_for_status()
+        return response.json()
+
+    def get_course_pages(self, course_id: int, include_body=False) -> List[canvasapi.page.Page]:
+        def list_pages():
+            course = self.get_course(course_id)
+            return self.list_course_pages(course, include_body=include_body)
+
+        # Concurrent listings of the same course, such as from a task and a course change, share one set of requests.
+        # Each caller gets its own copy of the list, since callers sort and filter them.
+        pages = self.__single_flight.do(('pages', str(course_id).strip(), include_body), list_pages)
+        return list(pages)
+
+    def list_course_pages(self, course: canvasapi.course.Course, include_body=False,
+                          cancel_event: threading.Event = None) -> List[canvasapi.page.Page]:
+        def list_with_graphql(graphql: CanvasGraphQLClient):
+            pages = graphql.get_course_pages(course.id, include_body=include_body, cancel_event=cancel_event)
+            for p in pages:
+                p['html_url'] = self.get_page_url(course.id, p['url'])
+            return pages
 
-    def get_course_pages(self, course_id: int) -> Iterable[canvasapi.page.Page]:
-        course = self.get_course(course_id)
-        pages = course.get_pages()
+        page_dicts = self.list_with_graphql('pages', list_with_graphql)
+        if page_dicts is not None:
+            return [canvasapi.page.Page(self.__requester, {**x, 'course_id': course.id}) for x in page_dicts]
+
+        params = {'include': ['body']} if include_body else {}
+        pages = self.list_paginated(f'courses/{course.id}/pages', canvasapi.page.Page, {'course_id': course.id},
+                                    cancel_event=cancel_event, **params)
         return pages
 
-    def get_course_page_titles(self, course_id: int) -> List[str]:
-        pages = self.get_course_pages(course_id)
-        page_titles = [p.title for p in pages]
-        return page_titles
+    def list_with_graphql(self, listing: str, func) -> Optional[List[dict]]:
+        """
+        Return the listing func makes with the GraphQL client, or None if GraphQL isn't in use or the listing fails.
+
+        A query Canvas rejects, such as one using a field this Canvas version lacks, will keep failing, so that listing
+        is made with the REST API for the rest of the session. Other listings still use GraphQL, and other failures are
+        retried with the next listing.
+        """
+        graphql = self.graphql
+        if graphql is None or listing in self.disabled_graphql_listings:
+            return None
+        try:
+            return func(graphql)
+        except GraphQLQueryFailed as e:
+            logger.warning('GraphQL %s listings are disabled for this session, listing with the REST API instead: %s',
+                           listing, e)
+            self.disabled_graphql_listings.add(listing)
+        except (requests.RequestException, KeyError, TypeError, ValueError) as e:
+            logger.info('GraphQL %s listing failed, listing with the REST API instead: %r', listing, e)
+        return None
+
+    def list_paginated(self, endpoint: str, cls, extra_attributes: dict = None, cancel_event: threading.Event = None,
+                       **params) -> list:
+        """
+        Fetch every page of a Canvas API listing, and build a cls object from each JSON object in it, in order.
+
+        When the first page's Link header gives the number of the last page, the remaining pages are requested
+        concurrently. Otherwise, the next links are followed one at a time, as canvasapi's PaginatedList does.
+        """
+        kwargs = combine_kwargs(per_page=MAX_PER_PAGE, **params)
+
+        # The requester converts its keyword arguments in place, so each request gets its own copy.
+        response = self.__requester.request('GET', endpoint, _kwargs=list(kwargs))
+        results = response.json()
+        last_page = self.get_page_number(response.links.get('last', {}).get('url'))
+
+        if last_page:
+            def get_page(page_number):
+                page_response = self.__requester.request('GET', endpoint, _kwargs=kwargs + [('page', page_number)])
+                return page_response.json()
+
+            pages = {}
+            for page_number, future in self.map_concurrently(get_page, range(2, last_page + 1),
+                                                             cancel_event=cancel_event):
+                pages[page_number] = future.result()
+            for page_number in sorted(pages):
+                results.extend(pages[page_number])
+        else:
+            next_url = response.links.get('next', {}).get('url')
+            while next_url and not self.is_canceled(cancel_event):
+                response = self.__requester.request('GET', _url=next_url)
+                results.extend(response.json())
+                next_url = response.links.get('next', {}).get('url')
 
-    def get_file_id_from_display_name(self, course_id: int, display_name: str) -> int:
-        course = self.get_course(course_id)
-        course_files = course.get_files()
+        extra_attributes = extra_attributes or {}
+        return [cls(self.__requester, {**x, **extra_attributes}) for x in results]
 
-        for f in course_files:
-            if f.display_name == display_name:
-                return f.id
+    @staticmethod
+    def get_page_number(url: str) -> Optional[int]:
+        """
+        Return the page number in a pagination link, or None if it has none, such as when Canvas uses bookmarks.
+        """
+        if not url:
+            return None
+        page = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get('page', [''])[0]
+        if page.isdigit():
+            return int(page)
+        return None
+
+    def get_page_reference(self, course_id: int, url: str) -> canvasapi.page.Page:
+        # Editing or deleting a page only needs its course ID and URL, so there is no need to fetch it first.
+        page = canvasapi.page.Page(self.__requester, {'course_id': course_id, 'url': url})
+        return page
 
-    def publish_page_by_url(self, url: str, course_id: int):
-        course = self.get_course(course_id)
-        page = course.get_page(url)
-        page_dict = page.attributes
-        page_dict['published'] = True
-        self.delete_page_by_url(url, course_id)
-        course.create_page(page_dict)
+    def edit_page_by_url(self, url: str, course_id: int, page_dict: dict) -> canvasapi.page.Page:
+        page = self.get_page_reference(course_id, url)
+        page.edit(wiki_page=page_dict)
+        return page
+
+    def publish_page_by_url(self, url: str, course_id: int) -> canvasapi.page.Page:
+        page = self.edit_page_by_url(url, course_id, {'published': True})
+        return page
 
     def delete_page_by_url(self, url: str, course_id: int):
-        course = self.get_course(course_id)
-        page = course.get_page(url)
+        page = self.get_page_reference(course_id, url)
         page.delete()
 
-    def get_course_files(self, course_id: int) -> Iterable[canvasapi.file.File]:
-        course = self.get_course(course_id)
-        files = course.get_files()
-        return files
+    def get_course_files(self, course_id: int) -> List[canvasapi.file.File]:
+        def list_files():
+            course = self.get_course(course_id)
+            file_dicts = self.list_with_graphql('files', lambda graphql: graphql.get_course_files(course.id))
+            if file_dicts is not None:
+                return [canvasapi.file.File(self.__requester, x) for x in file_dicts]
+            return self.list_paginated(f'courses/{course.id}/files', canvasapi.file.File)
 
-    def overwrite_page_by_url(self, course_id: int, url: str, new_page: dict):
-        self.delete_page_by_url(url, course_id)
-        self.add_page_to_course(new_page, course_id)
+        files = self.__single_flight.do(('files', str(course_id).strip()), list_files)
+        return list(files)
 
-    def search_pages_from_enrolled_courses(self, search_string: str,
-                                           ignore_case=True, whole_word=False) -> Iterable[canvasapi.page.Page]:
-        pages = self.get_pages_for_enrolled_courses()
-        matches = self.search_pages_with_term(search_string, pages, ignore_case=ignore_case, whole_word=whole_word)
+    def overwrite_page_by_url(self, course_id: int, url: str, new_page: dict) -> canvasapi.page.Page:
+        page = self.edit_page_by_url(url, course_id, new_page)
+        return page
+
+    def search_pages_from_enrolled_courses(self, search_string: str, ignore_case=True, whole_word=False,
+                                           cancel_event: threading.Event = None) -> Iterable[canvasapi.page.Page]:
+        pages = self.get_pages_for_enrolled_courses(include_body=not (self.page_cache or self.search_index),
+                                                    cancel_event=cancel_event)
+        matches = self.search_pages_with_term(search_string, pages, ignore_case=ignore_case, whole_word=whole_word,
+                                              cancel_event=cancel_event)
         return matches
 
-    def search_pages_from_course(self, course_id, search_string,
-                                 ignore_case=True, whole_word=False) -> Iterable[canvasapi.page.Page]:
-        course = self.__session.get_course(course_id)
-        pages = course.get_pages()
-        matches = self.search_pages_with_term(search_string, pages, ignore_case=ignore_case, whole_word=whole_word)
+    def search_pages_from_course(self, course_id, search_string, ignore_case=True, whole_word=False,
+                                 cancel_event: threading.Event = None) -> Iterable[canvasapi.page.Page]:
+        pages = self.get_course_pages(course_id, include_body=not (self.page_cache or self.search_index))
+        matches = self.search_pages_with_term(search_string, pages, ignore_case=ignore_case, whole_word=whole_word,
+                                              cancel_event=cancel_event)
         return matches
 
-    def delete_file(self, course_id: int, target_display_name: str):
-        course_files = self.get_course_files(course_id)
+    def delete_file_by_id(self, file_id: int) -> canvasapi.file.File:
+        file = canvasapi.file.File(self.__requester, {'id': file_id})
+        deleted_file = file.delete()
+        assert deleted_file.id == file.id
+        return deleted_file
 
-        for f in course_files:
-            try:
-                if target_display_name in f.display_name:
-                    f.delete()
-                    break
-            except AttributeError:
-                pass
+    def get_pages_for_enrolled_courses(self, include_body=False,
+                                       cancel_event: threading.Event = None) -> Iterable[canvasapi.page.Page]:
+        courses = self.get_enrolled_courses()
 
-        course_files = self.get_course_files(course_id)
-        assert target_display_name not in [f.display_name for f in course_files]
+        def list_pages(c):
+            return self.list_course_pages(c, include_body=include_body, cancel_event=cancel_event)
 
-    def get_pages_for_enrolled_courses(self) -> Iterable[canvasapi.page.Page]:
-        courses = self.get_enrolled_courses()
-        for c in courses:
-            pages = c.get_pages()
-            for p in pages:
+        for c, future in self.map_concurrently(list_pages, courses, cancel_event=cancel_event):
+            for p in future.result():
                 yield p
 
-    @staticmethod
-    def search_pages_with_term(search_term: str, pages: Iterable[canvasapi.page.Page],
-                               ignore_case=True, whole_word=False) -> Iterable[canvasapi.page.Page]:
+    def search_pages_with_term(self, search_term: str, pages: Iterable[canvasapi.page.Page], ignore_case=True,
+                               whole_word=False, cancel_event: threading.Event = None) -> Iterable[canvasapi.page.Page]:
         if whole_word:
             pattern = r'\b' + re.escape(search_term) + r'\b'
         else:
@@ -156,10 +368,170 @@ class CanvasSessionHandler:
         else:
             regex = re.compile(pattern)
 
+        stale_pages = set()
+        listed_counts = None
+        if self.search_index:
+            pages, stale_pages, listed_counts = self.get_index_candidates(search_term, pages, whole_word=whole_word,
+                                                                          cancel_event=cancel_event)
+
+        reindexed = []
+        try:
+            for p, content in self.get_page_contents(pages, listed_counts=listed_counts, cancel_event=cancel_event):
+                if (p.course_id, p.url) in stale_pages:
+                    reindexed.append((p.course_id, p.url, p.updated_at, content))
+                    if len(reindexed) >= WRITE_BATCH_SIZE:
+                        self.search_index.add_many(reindexed)
+                        reindexed = []
+                if content:
+                    match = regex.search(content)
+                    if match:
+                        yield p
+        finally:
+            # Also runs when the search is canceled or abandoned, so the bodies already fetched aren't fetched again.
+            if reindexed:
+                self.search_index.add_many(reindexed)
+
+    def get_index_candidates(self, search_term: str, pages: Iterable[canvasapi.page.Page], whole_word=False,
+                             cancel_event: threading.Event = None) -> tuple:
+        """
+        Narrow pages down to the ones that can contain the search term, using the search index.
+
+        Returns the candidate pages, the (course_id, url) keys of the candidates that must be reindexed, and the number
+        of pages listed in each course. Pages that changed since they were indexed are always candidates, and pages no
+        longer listed are dropped from the index.
+        """
+        current_pages = []
+        stale_pages = []
+        listed_urls = {}
+
         for p in pages:
-            r = p.show_latest_revision()
-            content = r.body
-            if content:
-                match = regex.search(content)
-                if match:
-                    yield p
+            listed_urls.setdefault(p.course_id, set()).add(p.url)
+            if self.search_index.is_current(p.course_id, p.url, p.updated_at):
+                current_pages.append(p)
+            else:
+                stale_pages.append(p)
+
+        # A canceled listing is incomplete, so it cannot tell which pages were removed from Canvas.
+        if self.is_canceled(cancel_event):
+            return [], set(), {}
+
+        for course_id, urls in listed_urls.items():
+            self.search_index.remove_missing(course_id, urls)
+        self.search_index.mark_used((p.course_id, p.url) for p in current_pages)
+
+        candidate_keys = self.search_index.get_candidates(search_term, listed_urls, whole_word=whole_word)
+        if candidate_keys is not None:
+            current_pages = [p for p in current_pages if (str(p.course_id), p.url) in candidate_keys]
+
+        stale_keys = {(p.course_id, p.url) for p in stale_pages}
+        listed_counts = {course_id: len(urls) for course_id, urls in listed_urls.items()}
+        return stale_pages + current_pages, stale_keys, listed_counts
+
+    def get_page_contents(self, pages: Iterable[canvasapi.page.Page], listed_counts: dict = None,
+                          cancel_event: threading.Event = None) -> Iterable[tuple]:
+        """
+        Yield (page, content) pairs for the given pages.
+
+        Bodies that came with the listing or are unchanged in the page cache are yielded first. The remaining bodies
+        are fetched concurrently, or by listing their course again with bodies when that takes fewer requests. When
+        pages is only part of each course's listing, listed_counts gives the number of pages in each course, which is
+        what listing the course again costs.
+        """
+        misses = {}
+        page_counts = Counter()
+        uncached = []
+
+        try:
+            for p in pages:
+                page_counts[p.course_id] += 1
+                if hasattr(p, 'body'):
+                    self.cache_page_content(uncached, p, p.body)
+                    yield p, p.body
+                    continue
+
+                content = None
+                if self.page_cache:
+                    content = self.page_cache.get(p.course_id, p.url, p.updated_at)
+
+                if content is None:
+                    misses.setdefault(p.course_id, []).append(p)
+                else:
+                    yield p, content
+
+            if self.page_cache:
+                self.page_cache.save_usage()
+
+            fetch_jobs = []
+            for course_id, missed_pages in misses.items():
+                listed_count = (listed_counts or page_counts).get(course_id, page_counts[course_id])
+                listing_cost = math.ceil(listed_count / MAX_PER_PAGE)
+                if len(missed_pages) <= listing_cost:
+                    fetch_jobs.extend((self.fetch_page_contents, [p]) for p in missed_pages)
+                else:
+                    fetch_jobs.append((self.fetch_course_page_contents, course_id, {p.url for p in missed_pages}))
+
+            for _, future in self.map_concurrently(lambda job: job[0](*job[1:]), fetch_jobs,
+                                                   cancel_event=cancel_event):
+                for p, content in future.result():
+                    self.cache_page_content(uncached, p, content)
+                    yield p, content
+        finally:
+            # Also runs when the caller stops early, so the bodies already fetched aren't fetched again.
+            if uncached:
+                self.page_cache.put_many(uncached)
+
+    def fetch_page_contents(self, pages: List[canvasapi.page.Page]) -> List[tuple]:
+        return [(p, self.get_page_content(p)) for p in pages]
+
+    def fetch_course_page_contents(self, course_id: int, urls: set) -> List[tuple]:
+        course = self.get_course(course_id)
+        pages = self.list_course_pages(course, include_body=True)
+        return [(p, p.body) for p in pages if p.url in urls]
+
+    def cache_page_content(self, uncached: list, page: canvasapi.page.Page, content: str):
+        # Bodies are collected in uncached and written a batch at a time.
+        if self.page_cache:
+            uncached.append((page.course_id, page.url, page.updated_at, content))
+            if len(uncached) >= WRITE_BATCH_SIZE:
+                self.page_cache.put_many(uncached)
+                uncached.clear()
+
+    def map_concurrently(self, func, items: Iterable, cancel_event: threading.Event = None) -> Iterable[tuple]:
+        """
+        Call func on each item using at most max_concurrency worker threads.
+
+        Yields (item, future) pairs in completion order. Items are pulled from the iterable lazily, so no more than
+        max_concurrency calls are ever queued or running at once. The requests made by those calls are further
+        limited by the session's throttle.
+
+        Once cancel_event is set, no more calls are started and the results that have already finished are the last
+        ones yielded. Calls still running are left to finish in the background rather than waited on.
+        """
+        items = iter(items)
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        pending = {}
+        try:
+            for item in items:
+                pending[executor.submit(func, item)] = item
+                if len(pending) >= self.max_concurrency:
+                    break
+
+            while pending and not self.is_canceled(cancel_event):
+                done, _ = wait(pending, timeout=CANCEL_CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    item = pending.pop(future)
+                    yield item, future
+
+                    if self.is_canceled(cancel_event):
+                        continue
+                    for next_item in items:
+                        pending[executor.submit(func, next_item)] = next_item
+                        break
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    @staticmethod
+    def is_canceled(cancel_event: Optional[threading.Event]) -> bool:
+        return cancel_event is not None and cancel_event.is_set()
@@ -0,0 +1,133 @@
+import tkinter
+from enum import Enum
+from pathlib import Path
+from tkinter import ttk, messagebox
+from typing import Dict, List, Optional, Set, Tuple
+
+
+class ConflictAction(Enum):
+    RENAME = 'Rename'
+    OVERWRITE = 'Overwrite'
+    SKIP = 'Skip'
+
+
+class ConflictResolutionDialog:
+    """
+    Ask how to resolve every title conflict in an upload at once, with a rename, overwrite or skip choice per file.
+    """
+    def __init__(self, parent: tkinter.Misc, item_name: str, conflicts: List[Tuple[Path, str]],
+                 existing_titles: Set[str], taken_titles: Set[str]):
+        self.item_name = item_name
+        self.conflicts = conflicts
+        self.existing_titles = existing_titles
+        self.taken_titles = taken_titles
+        self.result: Optional[Dict[Path, Tuple[ConflictAction, str]]] = None
+        self.rows = []
+
+        self.top = tkinter.Toplevel(parent)
+        self.top.title(f'Conflicting {item_name} Titles')
+        self.top.transient(parent.winfo_toplevel())
+        self.top.resizable(0, 1)
+
+        self.msg_lbl = ttk.Label(self.top, wraplength=450,
+                                 text=f'A {item_name} with each of the following titles already exists or is already '
+                                      f'being uploaded. Choose whether to rename, overwrite or skip each file.')
+
+        self.table_frame = ttk.Frame(self.top)
+        self.table_canvas = tkinter.Canvas(self.table_frame, highlightthickness=0, height=300, width=450)
+        self.y_scroll = ttk.Scrollbar(self.table_frame, orient='vertical', command=self.table_canvas.yview)
+        self.table_canvas.configure(yscrollcommand=self.y_scroll.set)
+        self.rows_frame = ttk.Frame(self.table_canvas)
+        self.table_canvas.create_window((0, 0), window=self.rows_frame, anchor='nw')
+        self.rows_frame.bind('<Configure>',
+                             lambda x: self.table_canvas.configure(scrollregion=self.table_canvas.bbox('all')))
+
+        ttk.Label(self.rows_frame, text='File').grid(row=0, column=0, padx=5, sticky='W')
+        ttk.Label(self.rows_frame, text='Title').grid(row=0, column=1, padx=5, sticky='W')
+        ttk.Label(self.rows_frame, text='Action').grid(row=0, column=2, padx=5, sticky='W')
+
+        actions = list(x.value for x in ConflictAction)
+        for i, (path, title) in enumerate(conflicts, start=1):
+            title_var = tkinter.StringVar(value=title)
+            action_var = tkinter.StringVar(value=ConflictAction.SKIP.value)
+            title_entry = ttk.Entry(self.rows_frame, textvariable=title_var, width=30, state='disabled')
+            action_combo = ttk.Combobox(self.rows_frame, values=actions, textvariable=action_var,
+                                        width=10, state='readonly')
+            action_var.trace('w', lambda x, y, z, e=title_entry, v=action_var: self.update_title_entry(e, v))
+
+            ttk.Label(self.rows_frame, text=path.name).grid(row=i, column=0, padx=5, pady=1, sticky='W')
+            title_entry.grid(row=i, column=1, padx=5, pady=1, sticky='W')
+            action_combo.grid(row=i, column=2, padx=5, pady=1, sticky='W')
+            self.rows.append((path, title, title_var, action_var))
+
+        self.table_canvas.grid(row=0, column=0, sticky='NS')
+        self.y_scroll.grid(row=0, column=1, sticky='NS')
+        self.table_frame.rowconfigure(0, weight=1)
+
+        self.button_frame = ttk.Frame(self.top)
+        self.overwrite_all_btn = ttk.Button(self.button_frame, text='Overwrite All',
+                                            command=lambda: self.set_all_actions(ConflictAction.OVERWRITE))
+        self.skip_all_btn = ttk.Button(self.button_frame, text='Skip All',
+                                       command=lambda: self.set_all_actions(ConflictAction.SKIP))
+        self.ok_btn = ttk.Button(self.button_frame, text='Upload', command=self.ok_btn_callback)
+        self.cancel_btn = ttk.Button(self.button_frame, text='Cancel', command=self.top.destroy)
+
+        self.overwrite_all_btn.grid(row=0, column=0, padx=5, pady=5)
+        self.skip_all_btn.grid(row=0, column=1, padx=5, pady=5)
+        self.ok_btn.grid(row=0, column=2, padx=5, pady=5)
+        self.cancel_btn.grid(row=0, column=3, padx=5, pady=5)
+
+        self.msg_lbl.grid(row=0, column=0, padx=5, pady=5, sticky='W')
+        self.table_frame.grid(row=1, column=0, padx=5, sticky='NS')
+        self.button_frame.grid(row=2, column=0, sticky='E')
+        self.top.rowconfigure(1, weight=1)
+
+    def show(self) -> Optional[Dict[Path, Tuple[ConflictAction, str]]]:
+        """
+        Wait for the user to close the dialog. Returns None if the upload was canceled.
+        """
+        self.top.grab_set()
+        self.top.wait_window()
+        return self.result
+
+    @staticmethod
+    def update_title_entry(title_entry: ttk.Entry, action_var: tkinter.StringVar):
+        if action_var.get() == ConflictAction.RENAME.value:
+            title_entry.configure(state='normal')
+        else:
+            title_entry.configure(state='disabled')
+
+    def set_all_actions(self, action: ConflictAction):
+        for _, _, _, action_var in self.rows:
+            action_var.set(action.value)
+
+    def ok_btn_callback(self):
+        result = {}
+        new_titles = set()
+        overwritten_titles = set()
+
+        for path, title, title_var, action_var in self.rows:
+            action = ConflictAction(action_var.get())
+
+            if action == ConflictAction.RENAME:
+                title = title_var.get().strip()
+                if not title or title in self.existing_titles or title in self.taken_titles or title in new_titles:
+                    messagebox.showerror('Conflicting Title',
+                                         f'Enter a new, unused title for:\n\n{path.name}', parent=self.top)
+                    return
+                new_titles.add(title)
+
+            elif action == ConflictAction.OVERWRITE:
+                # Only one file may replace an existing item, and a title that another file in this upload already
+                # claims isn't free to be overwritten either.
+                if title not in self.existing_titles or title in self.taken_titles or title in overwritten_titles:
+                    messagebox.showerror('Cannot Overwrite',
+                                         f'"{title}" is being uploaded by another file in this upload, so it cannot '
+                                         f'be overwritten. Rename or skip:\n\n{path.name}', parent=self.top)
+                    return
+                overwritten_titles.add(title)
+
+            result[path] = (action, title)
+
+        self.result = result
+        self.top.destroy()
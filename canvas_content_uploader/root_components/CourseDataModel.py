@@ -0,0 +1,111 @@
+import threading
+from collections import Counter
+from enum import Enum
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from canvas_content_uploader.root_components.BackgroundExecutor import BackgroundJob
+    from canvas_content_uploader.root_components.CanvasSessionHandler import CanvasSessionHandler
+
+
+class ContentKind(Enum):
+    PAGES = 'Pages'
+    FILES = 'Files'
+
+
+class CourseDataModel:
+    """
+    Share the page and file listings of the selected course between tasks.
+
+    Each listing is fetched once and kept until another course is selected or a task changes that kind of content.
+    Only the main window selects a course, when the user changes it. Listings of any other course are never kept.
+    Every change to a listing bumps its version, so a task can tell whether the items it is showing are out of date.
+    Listings can be loaded in advance with prefetch, so tasks opened after a course change find them ready.
+    """
+    def __init__(self, csh: 'CanvasSessionHandler'):
+        self.csh = csh
+        self.course_id = None
+        self.__listings: Dict[ContentKind, list] = {}
+        self.__versions = Counter()
+        self.__lock = threading.Lock()
+
+    def get_pages(self, course_id: int) -> list:
+        return self.get_items(ContentKind.PAGES, course_id, self.csh.get_course_pages)
+
+    def get_files(self, course_id: int) -> list:
+        return self.get_items(ContentKind.FILES, course_id, self.csh.get_course_files)
+
+    def get_items(self, kind: ContentKind, course_id: int, fetch: Callable) -> list:
+        """
+        Return a copy of a listing, fetching it if it isn't loaded yet.
+
+        A course other than the selected one is fetched every time, without replacing the selected course's listings.
+        """
+        with self.__lock:
+            if course_id != self.course_id:
+                listing = None
+            else:
+                listing = self.__listings.get(kind)
+            version = self.__versions[kind]
+
+        if listing is not None:
+            return list(listing)
+
+        items = list(fetch(course_id))
+        with self.__lock:
+            # Don't store a listing that was invalidated while it was being fetched.
+            if course_id == self.course_id and version == self.__versions[kind]:
+                self.__listings[kind] = items
+        return list(items)
+
+    def set_items(self, kind: ContentKind, course_id: int, items: List) -> int:
+        """
+        Replace a listing with one a task has already fetched or updated itself. Returns the listing's new version.
+        """
+        with self.__lock:
+            if course_id != self.course_id:
+                return self.__versions[kind]
+            self.__listings[kind] = list(items)
+            self.__versions[kind] += 1
+            return self.__versions[kind]
+
+    def select_course(self, course_id: int):
+        with self.__lock:
+            self.__select_course(course_id)
+
+    def prefetch(self, job: 'BackgroundJob', course_id: int, include_page_bodies=False):
+        """
+        Load the page and file listings of the selected course, and optionally its page bodies into the page cache.
+
+        Stops once the job is canceled, and never replaces the listings of a course selected in the meantime.
+        """
+        def warm(kind):
+            if job.cancelled or course_id != self.course_id:
+                return None
+            fetch = self.csh.get_course_pages if kind == ContentKind.PAGES else self.csh.get_course_files
+            return self.get_items(kind, course_id, fetch)
+
+        listings = dict(self.csh.map_concurrently(warm, list(ContentKind), cancel_event=job.cancel_event))
+        pages = listings[ContentKind.PAGES].result() if ContentKind.PAGES in listings else None
+
+        if include_page_bodies and self.csh.page_cache and pages:
+            for _ in self.csh.get_page_contents(pages, cancel_event=job.cancel_event):
+                pass
+
+    def get_version(self, kind: ContentKind) -> int:
+        with self.__lock:
+            return self.__versions[kind]
+
+    def invalidate(self, kind: ContentKind = None):
+        with self.__lock:
+            kinds = [kind] if kind else list(ContentKind)
+            for k in kinds:
+                self.__listings.pop(k, None)
+                self.__versions[k] += 1
+
+    def __select_course(self, course_id: int):
+        if course_id != self.course_id:
+            self.course_id = course_id
+            self.__listings = {}
+            for k in ContentKind:
+                self.__versions[k] += 1
@@ -0,0 +1,154 @@
+import tkinter
+from tkinter import ttk
+from typing import Callable, List, Sequence
+
+# The number of rows inserted into the listbox per idle callback, so long lists never block the main loop.
+RENDER_CHUNK_ROWS = 500
+
+
+class NameFilter:
+    """
+    Find the names containing a search string, ignoring case, using lowercase copies made once up front.
+
+    A search that extends the previous one only rescans the previous matches, so typing narrows the results without
+    scanning every name again.
+    """
+    def __init__(self, names: Sequence[str] = ()):
+        self.lower_names = []
+        self.__last_query = ''
+        self.__last_matches = []
+        self.extend(names)
+
+    def extend(self, names: Sequence[str]) -> List[int]:
+        """
+        Add names to the end of the list. Returns the indices of the new names that match the last search.
+        """
+        start = len(self.lower_names)
+        self.lower_names.extend(x.lower() for x in names)
+        new_matches = [i for i in range(start, len(self.lower_names)) if self.__last_query in self.lower_names[i]]
+        self.__last_matches.extend(new_matches)
+        return new_matches
+
+    def match(self, query: str) -> List[int]:
+        """
+        Return the indices, in their original order, of the names that contain query.
+        """
+        query = query.lower()
+        if query and self.__last_query and query.startswith(self.__last_query):
+            candidates = self.__last_matches
+        else:
+            candidates = range(len(self.lower_names))
+
+        if query:
+            matches = [i for i in candidates if query in self.lower_names[i]]
+        else:
+            matches = list(candidates)
+
+        self.__last_query = query
+        self.__last_matches = matches
+        return list(matches)
+
+
+class FilterableListbox:
+    """
+    Listbox with a type-to-filter entry, which adds its rows a chunk at a time so long lists stay responsive.
+
+    Indices passed in and out of this class refer to the full list of names, not to the rows currently shown.
+    """
+    def __init__(self, parent: tkinter.Misc, width=30, selectmode='browse'):
+        self.names = []
+        self.name_filter = NameFilter()
+        self.shown_indices = []
+        self.filter_var = tkinter.StringVar()
+        self.__render_job = None
+        self.__rendered_rows = 0
+
+        self.frame = ttk.Frame(parent)
+        self.filter_frame = ttk.Frame(self.frame)
+        self.filter_lbl = ttk.Label(self.filter_frame, text='Filter:', state='disabled')
+        self.filter_entry = ttk.Entry(self.filter_frame, textvariable=self.filter_var, state='disabled')
+        self.listbox = tkinter.Listbox(self.frame, width=width, relief='sunken', state='disabled',
+                                       activestyle='none', selectmode=selectmode)
+
+        self.x_scroll = ttk.Scrollbar(self.frame, orient='horizontal', command=self.listbox.xview)
+        self.y_scroll = ttk.Scrollbar(self.frame, orient='vertical', command=self.listbox.yview)
+        self.listbox.configure(xscrollcommand=self.x_scroll.set, yscrollcommand=self.y_scroll.set)
+
+        self.filter_lbl.grid(row=0, column=0, sticky='W')
+        self.filter_entry.grid(row=0, column=1, sticky='EW', padx=2.5, pady=2.5)
+        self.filter_frame.columnconfigure(1, weight=1)
+
+        self.filter_frame.grid(row=0, column=0, sticky='EW')
+        self.listbox.grid(row=1, column=0, sticky='NSEW')
+        self.x_scroll.grid(row=2, column=0, sticky='NEW')
+        self.y_scroll.grid(row=1, column=1, sticky='NSW')
+
+        self.filter_var.trace('w', lambda x, y, z: self.apply_filter())
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def bind_double_click(self, callback: Callable):
+        self.listbox.bind('<Double-1>', lambda x: callback())
+
+    def enable(self):
+        self.listbox.configure(state='normal')
+        self.filter_lbl.configure(state='enable')
+        self.filter_entry.configure(state='normal')
+
+    def set_names(self, names: Sequence[str]):
+        self.names = list(names)
+        self.name_filter = NameFilter(self.names)
+        self.apply_filter()
+
+    def add_names(self, names: Sequence[str]):
+        self.names.extend(names)
+        self.shown_indices.extend(self.name_filter.extend(names))
+        self.schedule_render()
+
+    def apply_filter(self):
+        self.shown_indices = self.name_filter.match(self.filter_var.get())
+        self.with_listbox_enabled(lambda: self.listbox.delete(0, 'end'))
+        self.__rendered_rows = 0
+        self.schedule_render()
+
+    def schedule_render(self):
+        if self.__render_job is None:
+            self.__render_job = self.listbox.after_idle(self.render_chunk)
+
+    def render_chunk(self):
+        self.__render_job = None
+        start = self.__rendered_rows
+        end = min(len(self.shown_indices), start + RENDER_CHUNK_ROWS)
+        if start >= end:
+            return
+
+        rows = [self.names[i] for i in self.shown_indices[start:end]]
+        self.with_listbox_enabled(lambda: self.listbox.insert('end', *rows))
+        self.__rendered_rows = end
+
+        if end < len(self.shown_indices):
+            self.__render_job = self.listbox.after(1, self.render_chunk)
+
+    def with_listbox_enabled(self, func: Callable):
+        # A disabled listbox ignores inserts and deletes.
+        state = str(self.listbox.cget('state'))
+        if state == 'disabled':
+            self.listbox.configure(state='normal')
+        try:
+            func()
+        finally:
+            if state == 'disabled':
+                self.listbox.configure(state='disabled')
+
+    def get_selected_indices(self) -> List[int]:
+        return [self.shown_indices[x] for x in self.listbox.curselection()]
+
+    def get_selected_names(self) -> List[str]:
+        return [self.names[x] for x in self.get_selected_indices()]
+
+    def clear_selection(self):
+        self.listbox.selection_clear(0, 'end')
+
+    def __len__(self):
+        return len(self.names)
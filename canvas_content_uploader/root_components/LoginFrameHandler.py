@@ -149,6 +149,7 @@ class LoginFrameHandler:
     def select_by_course_id_select_btn_callback(self):
         c = self.csh
         course_id = self.course_id_entry.get()
+        c.invalidate_course_cache()
         try:
             course = c.get_course(course_id)
             self.selected_course_id_var.set(course.id)
@@ -198,6 +199,7 @@ class LoginFrameHandler:
             except NoCoursesLoaded:
                 raise
 
+        self.csh.invalidate_course_cache()
         self.selected_course_id_var.set(course_id)
 
     def get_course_id_from_combo_selection(self):
@@ -3,7 +3,9 @@ from pathlib import Path
 from tkinter import ttk, messagebox
 
 from canvas_content_uploader.gui_abcs.Task import Task
+from canvas_content_uploader.root_components.BackgroundExecutor import BackgroundExecutor
 from canvas_content_uploader.root_components.CanvasSessionHandler import CanvasSessionHandler
+from canvas_content_uploader.root_components.CourseDataModel import CourseDataModel
 from canvas_content_uploader.root_components.LoginFrameHandler import LoginFrameHandler
 from canvas_content_uploader.tasks.ManageFilesTask import ManageFilesTask
 from canvas_content_uploader.tasks.ManagePagesTask import ManagePagesTask
@@ -14,12 +16,16 @@ from canvas_content_uploader.tasks.UploadPagesTask import UploadPagesTask
 
 DEFAULT_TASK = TaskName.UPLOAD_PAGES.name
 
+# Selecting a course sets both course variables, so course changes are handled once they have been quiet this long,
+# in milliseconds.
+COURSE_CHANGE_DELAY = 100
+
 
 class MasterGui:
     """
     Display and handle operations between root GUI components and Tasks.
     """
-    def __init__(self, canvas_url: str, title: str, icon_path: Path = None):
+    def __init__(self, canvas_url: str, title: str, icon_path: Path = None, session_options: dict = None):
 
         self.root = self.init_root(title, icon_path)
         self.root.resizable(0, 0)
@@ -28,11 +34,17 @@ class MasterGui:
         self.task_var = tkinter.StringVar()
 
         self.current_task: Task = None
+        self.tasks = {}
+        self.course_change_job = None
+        self.handled_course_id = None
+        self.prefetch_job = None
 
         self.selected_course_combo_var = tkinter.StringVar()
         self.selected_course_id_var = tkinter.IntVar()
 
-        self.csh = CanvasSessionHandler(canvas_url)
+        self.csh = CanvasSessionHandler(canvas_url, **(session_options or {}))
+        self.executor = BackgroundExecutor(self.root)
+        self.course_data = CourseDataModel(self.csh)
 
         self.login_frame = self.init_login_frame()
         self.task_frame = self.init_task_frame()
@@ -49,17 +61,58 @@ class MasterGui:
         self.menu_bar.add_cascade(label='Task', menu=self.task_menu, state='disabled')
 
         self.root.config(menu=self.menu_bar)
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
 
     def enable_task_selection(self):
         self.menu_bar.entryconfigure(2, state='normal')
 
     def set_course_change_traces(self):
-        self.selected_course_combo_var.trace('wu', lambda x, y, z: self.current_task.handle_course_change())
-        self.selected_course_id_var.trace('wu', lambda x, y, z: self.current_task.handle_course_change())
+        self.selected_course_combo_var.trace('wu', lambda x, y, z: self.schedule_course_change())
+        self.selected_course_id_var.trace('wu', lambda x, y, z: self.schedule_course_change())
+
+    def schedule_course_change(self):
+        if self.course_change_job:
+            self.root.after_cancel(self.course_change_job)
+        self.course_change_job = self.root.after(COURSE_CHANGE_DELAY, self.handle_course_change)
+
+    def handle_course_change(self):
+        self.course_change_job = None
+        try:
+            course_id = self.selected_course_id_var.get()
+        except tkinter.TclError:
+            # The course ID entry holds text that is not a number yet.
+            return
+
+        if course_id == self.handled_course_id:
+            return
+        self.handled_course_id = course_id
+        self.course_data.select_course(course_id)
+        self.start_prefetch(course_id)
+        self.current_task.handle_course_change()
+
+    def start_prefetch(self, course_id: int):
+        if self.prefetch_job:
+            self.prefetch_job.cancel()
+            self.prefetch_job = None
+
+        if not course_id or not self.has_token_var.get():
+            return
+
+        # A failed prefetch is ignored, since each task loads whatever it still needs when it is shown.
+        self.prefetch_job = self.executor.submit(self.course_data.prefetch, course_id, self.csh.prefetch_page_bodies,
+                                                 on_error=lambda e: None)
 
     def run(self):
         self.root.mainloop()
 
+    def close(self):
+        # Worker threads are joined when the interpreter exits, so their work is canceled before the window goes away
+        # rather than left running with no window.
+        for task in self.tasks.values():
+            task.close()
+        self.executor.shutdown()
+        self.root.destroy()
+
     @staticmethod
     def init_root(title: str, icon_path: str = None):
         r = tkinter.Tk()
@@ -85,7 +138,7 @@ class MasterGui:
         menu = tkinter.Menu(self.root)
 
         file_menu = tkinter.Menu(menu, tearoff=0)
-        file_menu.add_command(label='Quit', command=self.root.quit)
+        file_menu.add_command(label='Quit', command=self.close)
         menu.add_cascade(label='File', menu=file_menu)
 
         return menu
@@ -116,8 +169,14 @@ class MasterGui:
         return task_menu
 
     def handle_task_selection(self):
-        self.reset_task_frame()
-        self.current_task = self.get_selected_task()
+        # Tasks are kept after they are hidden, so switching back to one reuses its widgets and loaded items.
+        if self.current_task:
+            self.current_task.grid_remove()
+
+        task_name = self.task_var.get()
+        if task_name not in self.tasks:
+            self.tasks[task_name] = self.get_selected_task()
+        self.current_task = self.tasks[task_name]
         self.current_task.grid()
         if self.has_token_var.get():
             self.current_task.enable_selection()
@@ -135,11 +194,6 @@ class MasterGui:
         elif t == TaskName.MANAGE_FILES.name:
             return ManageFilesTask(self)
 
-    def reset_task_frame(self):
-        self.task_frame.destroy()
-        del self.current_task
-        self.task_frame = self.init_task_frame()
-
     def init_login_frame(self) -> ttk.Frame:
         frame = ttk.Frame(self.root, borderwidth=5)
         frame.grid(row=0, sticky='W')
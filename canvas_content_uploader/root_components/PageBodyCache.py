@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+# The number of least recently used bodies read at a time while evicting, so eviction never reads the whole table.
+EVICT_BATCH_SIZE = 100
+
+
+class PageBodyCache:
+    """
+    Store wiki page bodies on disk, keyed by course ID and page URL.
+
+    A cached body is only returned while its updated_at value matches the one reported by Canvas, and the least
+    recently used bodies are evicted once the cache grows past max_bytes. Cache hits are recorded in memory and written
+    together by save_usage or the next put_many, so reading a body never waits on a disk write.
+    """
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__used = {}
+        self.__connection = sqlite3.connect(self.path.as_posix(), check_same_thread=False)
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS page_bodies ('
+                                  'course_id TEXT, url TEXT, updated_at TEXT, body TEXT, size INTEGER, '
+                                  'last_used REAL, PRIMARY KEY (course_id, url))')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS page_bodies_last_used ON page_bodies (last_used)')
+        self.__connection.commit()
+        self.__total_size = self.__connection.execute('SELECT COALESCE(SUM(size), 0) FROM page_bodies').fetchone()[0]
+
+    def get(self, course_id, url: str, updated_at: str) -> Optional[str]:
+        key = (str(course_id), url)
+        with self.__lock:
+            row = self.__connection.execute('SELECT updated_at, body FROM page_bodies '
+                                            'WHERE course_id = ? AND url = ?', key).fetchone()
+            if row is None or row[0] != updated_at:
+                return None
+            self.__used[key] = time.time()
+        return row[1]
+
+    def save_usage(self):
+        """
+        Write the last use of every body read since the last write, in one transaction.
+        """
+        with self.__lock:
+            if self.__used:
+                self.__save_usage()
+                self.__connection.commit()
+
+    def put_many(self, pages: Iterable[tuple]):
+        """
+        Store the bodies of several pages, given as (course_id, url, updated_at, body) tuples, in one transaction.
+        """
+        now = time.time()
+        with self.__lock:
+            for course_id, url, updated_at, body in pages:
+                body = body or ''
+                size = len(body.encode('utf-8'))
+                key = (str(course_id), url)
+                self.__remove(key)
+                self.__connection.execute('INSERT INTO page_bodies VALUES (?, ?, ?, ?, ?, ?)',
+                                          (*key, updated_at, body, size, now))
+                self.__total_size += size
+            self.__save_usage()
+            self.__evict()
+            self.__connection.commit()
+
+    def __save_usage(self):
+        self.__connection.executemany('UPDATE page_bodies SET last_used = ? WHERE course_id = ? AND url = ?',
+                                      ((last_used, *key) for key, last_used in self.__used.items()))
+        self.__used = {}
+
+    def __remove(self, key: tuple):
+        row = self.__connection.execute('SELECT size FROM page_bodies '
+                                        'WHERE course_id = ? AND url = ?', key).fetchone()
+        if row is not None:
+            self.__connection.execute('DELETE FROM page_bodies WHERE course_id = ? AND url = ?', key)
+            self.__total_size -= row[0]
+
+    def __evict(self):
+        while self.__total_size > self.max_bytes:
+            rows = self.__connection.execute('SELECT course_id, url, size FROM page_bodies '
+                                             'ORDER BY last_used LIMIT ?', (EVICT_BATCH_SIZE,)).fetchall()
+            if not rows:
+                break
+            for course_id, url, size in rows:
+                if self.__total_size <= self.max_bytes:
+                    break
+                self.__connection.execute('DELETE FROM page_bodies WHERE course_id = ? AND url = ?', (course_id, url))
+                self.__total_size -= size
@@ -0,0 +1,207 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Bumped whenever the table or the way terms are derived changes, so an index written by an older version is rebuilt.
+SCHEMA_VERSION = 2
+
+# Each page's terms are kept in a Bloom filter with about this many bits per distinct term, and each term sets two
+# of its bits. A term that isn't in a page is then mistaken for one that is about 5% of the time, so a search term
+# of a few trigrams rules out nearly every page that can't contain it.
+BITS_PER_TERM = 8
+MIN_FILTER_BITS = 64
+
+# Older SQLite versions allow at most 999 parameters in one statement.
+MAX_QUERY_PARAMETERS = 500
+
+# The number of least recently searched pages read at a time while evicting, so eviction never reads the whole table.
+EVICT_BATCH_SIZE = 100
+
+# Characters that re.IGNORECASE treats as equal although they lowercase differently, mapped to one of their equals.
+# Together with lower(), this makes two characters fold to the same character exactly when such a regex matches
+# one with the other.
+CASE_EQUIVALENTS = str.maketrans({
+    '\u0131': 'i', '\u017f': 's', '\u00b5': '\u03bc', '\u03c2': '\u03c3', '\u0345': '\u03b9', '\u1fbe': '\u03b9',
+    '\u03d0': '\u03b2', '\u03d1': '\u03b8', '\u03d5': '\u03c6', '\u03d6': '\u03c0', '\u03f0': '\u03ba',
+    '\u03f1': '\u03c1', '\u03f5': '\u03b5', '\u1fd3': '\u0390', '\u1fe3': '\u03b0', '\u1c80': '\u0432',
+    '\u1c81': '\u0434', '\u1c82': '\u043e', '\u1c83': '\u0441', '\u1c84': '\u0442', '\u1c85': '\u0442',
+    '\u1c86': '\u044a', '\u1c87': '\u0463', '\u1c88': '\ua64b', '\u1e9b': '\u1e61', '\ufb05': '\ufb06',
+})
+
+
+class PageSearchIndex:
+    """
+    Keep an on-disk index of wiki page bodies, used to narrow a search down to the pages that can match.
+
+    Each body is summarized by a Bloom filter of its case-folded word tokens, for full word searches, and of its
+    case-folded trigrams, for partial word searches. A page is reindexed whenever its updated_at value changes, and the
+    least recently searched pages are evicted once the index grows past max_bytes.
+    """
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(self.path.as_posix(), check_same_thread=False)
+        if self.__connection.execute('PRAGMA user_version').fetchone()[0] != SCHEMA_VERSION:
+            for table in ('page_documents', 'page_tokens', 'page_trigrams'):
+                self.__connection.execute(f'DROP TABLE IF EXISTS {table}')
+            self.__connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+        self.__connection.execute('CREATE TABLE IF NOT EXISTS page_documents ('
+                                  'course_id TEXT, url TEXT, updated_at TEXT, terms BLOB, size INTEGER, '
+                                  'last_used REAL, PRIMARY KEY (course_id, url))')
+        self.__connection.execute('CREATE INDEX IF NOT EXISTS page_documents_last_used '
+                                  'ON page_documents (last_used)')
+        self.__connection.commit()
+        self.__total_size = self.__connection.execute('SELECT COALESCE(SUM(size), 0) '
+                                                      'FROM page_documents').fetchone()[0]
+
+    @staticmethod
+    def fold_case(text: str) -> str:
+        """
+        Fold text to the form used for index terms, keeping one character for each character of text.
+
+        str.lower and str.casefold turn the dotted capital I into two characters, so "İstanbul" would not contain
+        the trigram "ist", even though an IGNORECASE regex for "ist" matches it.
+        """
+        return text.replace('İ', 'i').lower().translate(CASE_EQUIVALENTS)
+
+    @classmethod
+    def get_tokens(cls, text: str) -> Set[str]:
+        return set(TOKEN_PATTERN.findall(cls.fold_case(text)))
+
+    @classmethod
+    def get_trigrams(cls, text: str) -> Set[str]:
+        text = cls.fold_case(text)
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    @classmethod
+    def get_terms(cls, text: str) -> Set[str]:
+        # Tokens are marked so that a three letter word and the same trigram are separate terms.
+        return {f'\0{x}' for x in cls.get_tokens(text)} | cls.get_trigrams(text)
+
+    @staticmethod
+    def get_term_hash(term: str) -> int:
+        # Python's own str hash changes between runs, so a hash that is stable on disk is used instead.
+        return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+
+    @classmethod
+    def build_filter(cls, terms: Set[str]) -> bytes:
+        size = MIN_FILTER_BITS
+        while size < len(terms) * BITS_PER_TERM:
+            size *= 2
+
+        bits = bytearray(size // 8)
+        for term_hash in map(cls.get_term_hash, terms):
+            first, second = cls.get_positions(term_hash, size)
+            bits[first >> 3] |= 1 << (first & 7)
+            bits[second >> 3] |= 1 << (second & 7)
+        return bytes(bits)
+
+    @staticmethod
+    def get_positions(term_hash: int, size: int) -> Tuple[int, int]:
+        # Filter sizes are powers of two, so each half of the hash picks a bit with a mask.
+        return term_hash & (size - 1), (term_hash >> 32) & (size - 1)
+
+    @classmethod
+    def filter_contains(cls, bits: bytes, term_hashes: List[int]) -> bool:
+        size = len(bits) * 8
+        for term_hash in term_hashes:
+            for position in cls.get_positions(term_hash, size):
+                if not bits[position >> 3] & (1 << (position & 7)):
+                    return False
+        return True
+
+    def is_current(self, course_id, url: str, updated_at: str) -> bool:
+        with self.__lock:
+            row = self.__connection.execute('SELECT updated_at FROM page_documents '
+                                            'WHERE course_id = ? AND url = ?', (str(course_id), url)).fetchone()
+        return row is not None and row[0] == updated_at
+
+    def mark_used(self, keys: Iterable[tuple]):
+        """
+        Record that the pages with the given (course_id, url) keys were searched, so they are evicted last.
+        """
+        now = time.time()
+        with self.__lock:
+            self.__connection.executemany('UPDATE page_documents SET last_used = ? WHERE course_id = ? AND url = ?',
+                                          ((now, str(course_id), url) for course_id, url in keys))
+            self.__connection.commit()
+
+    def add_many(self, pages: Iterable[tuple]):
+        """
+        Index the bodies of several pages, given as (course_id, url, updated_at, body) tuples, in one transaction.
+        """
+        # Filters are built before taking the lock, so other threads can use the index meanwhile.
+        documents = [((str(course_id), url), updated_at, self.build_filter(self.get_terms(body or '')))
+                     for course_id, url, updated_at, body in pages]
+        now = time.time()
+        with self.__lock:
+            for key, updated_at, bits in documents:
+                self.__remove(key)
+                self.__connection.execute('INSERT INTO page_documents VALUES (?, ?, ?, ?, ?, ?)',
+                                          (*key, updated_at, bits, len(bits), now))
+                self.__total_size += len(bits)
+            self.__evict()
+            self.__connection.commit()
+
+    def remove_missing(self, course_id, urls: Iterable[str]):
+        urls = set(urls)
+        with self.__lock:
+            rows = self.__connection.execute('SELECT url FROM page_documents WHERE course_id = ?',
+                                             (str(course_id),)).fetchall()
+            for (url,) in rows:
+                if url not in urls:
+                    self.__remove((str(course_id), url))
+            self.__connection.commit()
+
+    def get_candidates(self, search_term: str, course_ids: Iterable, whole_word=False) -> Optional[Set[tuple]]:
+        """
+        Return the (course_id, url) pairs of the given courses' indexed pages that can contain the search term.
+
+        Returns None when the term is too short to be narrowed down by the index, in which case every page is a
+        candidate. Case is ignored here, and a few pages that don't contain the term are returned too, so candidates
+        still have to be confirmed against the page body.
+        """
+        terms = {f'\0{x}' for x in self.get_tokens(search_term)} if whole_word else set()
+        if not terms:
+            terms = self.get_trigrams(search_term)
+        if not terms:
+            return None
+
+        term_hashes = [self.get_term_hash(x) for x in terms]
+        course_ids = [str(x) for x in course_ids]
+        rows = []
+        with self.__lock:
+            for i in range(0, len(course_ids), MAX_QUERY_PARAMETERS):
+                chunk = course_ids[i:i + MAX_QUERY_PARAMETERS]
+                placeholders = ', '.join('?' * len(chunk))
+                rows.extend(self.__connection.execute('SELECT course_id, url, terms FROM page_documents '
+                                                      f'WHERE course_id IN ({placeholders})', chunk).fetchall())
+        return {(course_id, url) for course_id, url, bits in rows if self.filter_contains(bits, term_hashes)}
+
+    def __remove(self, key: tuple):
+        row = self.__connection.execute('SELECT size FROM page_documents '
+                                        'WHERE course_id = ? AND url = ?', key).fetchone()
+        if row is not None:
+            self.__connection.execute('DELETE FROM page_documents WHERE course_id = ? AND url = ?', key)
+            self.__total_size -= row[0]
+
+    def __evict(self):
+        while self.__total_size > self.max_bytes:
+            rows = self.__connection.execute('SELECT course_id, url, size FROM page_documents '
+                                             'ORDER BY last_used LIMIT ?', (EVICT_BATCH_SIZE,)).fetchall()
+            if not rows:
+                break
+            for course_id, url, size in rows:
+                if self.__total_size <= self.max_bytes:
+                    break
+                self.__connection.execute('DELETE FROM page_documents WHERE course_id = ? AND url = ?',
+                                          (course_id, url))
+                self.__total_size -= size
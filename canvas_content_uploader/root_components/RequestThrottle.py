@@ -0,0 +1,67 @@
+import threading
+import time
+from typing import Optional
+
+import requests
+
+# Canvas's rate limit bucket holds 700 units. The limit is cut before the bucket runs dry.
+LOW_REMAINING = 100
+
+# Responses that were already in flight when the limit was cut should not cut it again.
+DECREASE_INTERVAL = 1.0
+
+
+class RequestThrottle:
+    """
+    Limit the number of Canvas API requests in flight, adapting the limit to Canvas's rate limiting headers.
+
+    The limit grows by one request per window of successful responses (additive increase), and is halved whenever the
+    X-Rate-Limit-Remaining header runs low or Canvas rejects a request as throttled (multiplicative decrease).
+    """
+    def __init__(self, max_limit: int, min_limit=1, low_remaining=LOW_REMAINING):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.low_remaining = low_remaining
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.__condition = threading.Condition()
+        self.__last_decrease = 0.0
+
+    def acquire(self):
+        with self.__condition:
+            while self.in_flight >= int(self.limit):
+                self.__condition.wait()
+            self.in_flight += 1
+
+    def release(self, response: Optional[requests.Response] = None):
+        with self.__condition:
+            self.in_flight -= 1
+            if response is not None:
+                self.__adapt(response)
+            self.__condition.notify_all()
+
+    @staticmethod
+    def is_rate_limited(response: requests.Response) -> bool:
+        return response.status_code == 403 and 'Rate Limit Exceeded' in response.text
+
+    @staticmethod
+    def get_header_value(response: requests.Response, header: str) -> Optional[float]:
+        try:
+            return float(response.headers[header])
+        except (KeyError, ValueError):
+            return None
+
+    def __adapt(self, response: requests.Response):
+        remaining = self.get_header_value(response, 'X-Rate-Limit-Remaining')
+        cost = self.get_header_value(response, 'X-Request-Cost') or 0
+
+        # Requests still in flight will each take about as much from the bucket as this one did.
+        running_low = remaining is not None and remaining - cost * self.in_flight < self.low_remaining
+
+        if self.is_rate_limited(response) or running_low:
+            now = time.monotonic()
+            if now - self.__last_decrease >= DECREASE_INTERVAL:
+                self.limit = max(self.min_limit, self.limit / 2)
+                self.__last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
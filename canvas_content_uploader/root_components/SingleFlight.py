@@ -0,0 +1,34 @@
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Collapse identical concurrent calls into one, sharing its result (or exception) with every caller.
+    """
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self.__lock:
+            future = self.__calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self.__calls[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.__lock:
+                del self.__calls[key]
@@ -0,0 +1,107 @@
+import io
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Optional
+
+# http.client reads request bodies in small blocks, so this only bounds reads made by other callers.
+CHUNK_SIZE = 64 * 1024
+
+
+class BandwidthLimiter:
+    """
+    Share an upload bandwidth cap, in bytes per second, between every upload stream.
+    """
+    def __init__(self, max_bytes_per_second: int):
+        self.max_bytes_per_second = max_bytes_per_second
+        self.__lock = threading.Lock()
+        self.__next_send = time.monotonic()
+
+    def consume(self, num_bytes: int):
+        # Each chunk reserves the next free slot of send time, so concurrent streams share the cap.
+        with self.__lock:
+            now = time.monotonic()
+            start = max(now, self.__next_send)
+            self.__next_send = start + num_bytes / self.max_bytes_per_second
+            delay = start - now
+
+        if delay > 0:
+            time.sleep(delay)
+
+
+class MultipartFileStream:
+    """
+    File-like multipart/form-data request body, which reads the file from disk in chunks as it is sent.
+
+    The body length is known up front, so requests sends it with a Content-Length header rather than loading it into
+    memory or falling back to chunked transfer encoding.
+    """
+    def __init__(self, path: Path, fields: dict, progress_callback: Callable[[int], None] = None,
+                 limiter: Optional[BandwidthLimiter] = None):
+        self.path = Path(path)
+        self.progress_callback = progress_callback
+        self.limiter = limiter
+        self.bytes_sent = 0
+
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+
+        head = ''
+        for name, value in fields.items():
+            head += (f'--{boundary}\r\n'
+                     f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+                     f'{value}\r\n')
+        file_name = self.path.name.replace('"', '%22')
+        head += (f'--{boundary}\r\n'
+                 f'Content-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+                 f'Content-Type: application/octet-stream\r\n\r\n')
+        tail = f'\r\n--{boundary}--\r\n'
+
+        head = head.encode('utf-8')
+        tail = tail.encode('utf-8')
+        self.file_size = self.path.stat().st_size
+        self.__length = len(head) + self.file_size + len(tail)
+
+        self.__file = self.path.open('rb')
+        self.__parts = [io.BytesIO(head), self.__file, io.BytesIO(tail)]
+
+    def __len__(self):
+        return self.__length
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def read(self, size=-1) -> bytes:
+        if size is None or size < 0:
+            size = CHUNK_SIZE
+
+        while self.__parts:
+            part = self.__parts[0]
+            chunk = part.read(size)
+            if not chunk:
+                self.__parts.pop(0)
+                continue
+
+            if self.limiter:
+                self.limiter.consume(len(chunk))
+            if part is self.__file:
+                self.bytes_sent += len(chunk)
+                if self.progress_callback:
+                    self.progress_callback(self.bytes_sent)
+            return chunk
+
+        return b''
+
+    def close(self):
+        self.__file.close()
@@ -0,0 +1,140 @@
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+from canvas_content_uploader.exceptions import UploadCanceled
+
+UploadEvent = namedtuple('UploadEvent', ['item', 'status', 'error'])
+
+
+class UploadStatus(Enum):
+    QUEUED = 'Queued'
+    UPLOADING = 'Uploading'
+    DONE = 'Done'
+    FAILED = 'Failed'
+    CANCELED = 'Canceled'
+
+
+class UploadEngine:
+    """
+    Upload several items at once on a pool of worker threads.
+
+    Workers never touch the GUI. Instead, each status change is put on a queue, which the GUI drains with get_events.
+    upload_func is called with the item and a callback that takes the number of bytes of the item sent so far.
+    After cancel, items that have not started are skipped, and uploads in progress stop at their next progress report.
+    """
+    def __init__(self, upload_func: Callable, max_workers: int):
+        self.upload_func = upload_func
+        self.max_workers = max(1, max_workers)
+        self.items = []
+        self.total_bytes = 0
+        self.started_at = None
+        self.failures = []
+        self.completed = 0
+        self.canceled = 0
+        self.cancel_event = threading.Event()
+        self.__events = queue.Queue()
+        self.__futures = []
+        self.__bytes_sent = {}
+        self.__sizes = {}
+
+    @staticmethod
+    def read_item_size(item) -> int:
+        if isinstance(item, Path):
+            return item.stat().st_size
+        return 0
+
+    def get_item_size(self, item) -> int:
+        return self.__sizes.get(item, 0)
+
+    def start(self, items: Iterable):
+        self.items = list(items)
+        self.__sizes = {x: self.read_item_size(x) for x in self.items}
+        self.total_bytes = sum(self.__sizes.values())
+        # Every key is added up front, so workers only ever replace values while the GUI thread sums them.
+        self.__bytes_sent = {x: 0 for x in self.items}
+        self.started_at = time.monotonic()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.__futures = [executor.submit(self.__upload, x) for x in self.items]
+        executor.shutdown(wait=False)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def is_running(self) -> bool:
+        return any(not f.done() for f in self.__futures)
+
+    def get_events(self) -> List[UploadEvent]:
+        events = []
+        while True:
+            try:
+                event = self.__events.get_nowait()
+            except queue.Empty:
+                return events
+
+            if event.status in (UploadStatus.DONE, UploadStatus.FAILED, UploadStatus.CANCELED):
+                self.completed += 1
+            if event.status == UploadStatus.FAILED:
+                self.failures.append((event.item, event.error))
+                self.total_bytes -= self.get_item_size(event.item)
+            if event.status == UploadStatus.CANCELED:
+                self.canceled += 1
+                self.total_bytes -= self.get_item_size(event.item)
+            events.append(event)
+
+    @property
+    def bytes_done(self) -> int:
+        return sum(self.__bytes_sent.values())
+
+    def get_item_progress(self, item) -> float:
+        size = self.get_item_size(item)
+        if not size:
+            return 0.0
+        return self.__bytes_sent[item] / size
+
+    def get_seconds_remaining(self) -> Optional[float]:
+        throughput = self.get_throughput()
+        if not throughput:
+            return None
+        return (self.total_bytes - self.bytes_done) / throughput
+
+    def get_throughput(self) -> float:
+        """
+        Return the average upload speed so far, in bytes per second.
+        """
+        if self.started_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.started_at
+        if elapsed <= 0:
+            return 0.0
+        return self.bytes_done / elapsed
+
+    def __upload(self, item):
+        if self.cancel_event.is_set():
+            self.__events.put(UploadEvent(item, UploadStatus.CANCELED, None))
+            return
+        self.__events.put(UploadEvent(item, UploadStatus.UPLOADING, None))
+
+        def progress(bytes_sent):
+            # Raising from the progress callback aborts a streaming upload part way through.
+            if self.cancel_event.is_set():
+                raise UploadCanceled
+            self.__bytes_sent[item] = bytes_sent
+
+        try:
+            self.upload_func(item, progress)
+        except Exception as e:
+            self.__bytes_sent[item] = 0
+            if self.cancel_event.is_set():
+                self.__events.put(UploadEvent(item, UploadStatus.CANCELED, None))
+            else:
+                self.__events.put(UploadEvent(item, UploadStatus.FAILED, e))
+        else:
+            self.__bytes_sent[item] = self.get_item_size(item)
+            self.__events.put(UploadEvent(item, UploadStatus.DONE, None))
@@ -1,6 +1,7 @@
 import webbrowser
 
 from canvas_content_uploader.gui_abcs.ContentManager import ContentManager
+from canvas_content_uploader.root_components.CourseDataModel import ContentKind
 
 
 class ManageFilesTask(ContentManager):
@@ -9,10 +10,10 @@ class ManageFilesTask(ContentManager):
     """
     def __init__(self, master_gui):
         super().__init__(master_gui, 'File')
+        self.content_kind = ContentKind.FILES
 
-    def get_items(self):
-        course_id = self.get_selected_course_id()
-        files = list(self.csh.get_course_files(course_id))
+    def get_items(self, course_id):
+        files = self.course_data.get_files(course_id)
         return files
 
     def get_display_names(self, item_list):
@@ -27,15 +28,15 @@ class ManageFilesTask(ContentManager):
         k = item.display_name
         return k
 
-    def delete_item_by_displayed_name(self, displayed_name):
-        course_id = self.get_selected_course_id()
-        self.csh.delete_file(course_id, displayed_name)
+    def delete_item(self, course_id, displayed_name, item):
+        self.csh.delete_file_by_id(item.id)
 
     def double_click_callback(self):
-        course_id = self.get_selected_course_id()
-        file_display_name = self.get_selected_item()
-        file_id = self.csh.get_file_id_from_display_name(course_id, file_display_name)
-        file_url = self.csh.get_file_url(course_id, file_id)
+        selected = self.get_selected_item_objects()
+        if not selected:
+            return
+        # Files in different folders can share a display name, so the file is taken from the clicked row.
+        file_url = self.csh.get_file_url(self.loaded_course_id, selected[0].id)
         webbrowser.open(file_url)
 
     def cleanup_displayed_name(self, displayed_name):
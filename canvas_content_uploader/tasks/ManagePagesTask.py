@@ -1,9 +1,12 @@
+import math
 import urllib.parse
 import webbrowser
 from pathlib import Path
 from tkinter import messagebox
 
 from canvas_content_uploader.gui_abcs.ContentManager import ContentManager
+from canvas_content_uploader.root_components.CanvasSessionHandler import MAX_PER_PAGE
+from canvas_content_uploader.root_components.CourseDataModel import ContentKind
 
 
 class ManagePagesTask(ContentManager):
@@ -13,11 +16,11 @@ class ManagePagesTask(ContentManager):
     """
     def __init__(self, master_gui):
         super().__init__(master_gui, 'Page', has_publish_btn=True, has_download_btn=True)
+        self.content_kind = ContentKind.PAGES
+        self.download_pages = {}
 
-    def get_items(self):
-        course_id = self.get_selected_course_id()
-        pages = self.csh.get_course_pages(course_id)
-        p_list = list(p for p in pages)
+    def get_items(self, course_id):
+        p_list = self.course_data.get_pages(course_id)
         return p_list
 
     def get_display_names(self, item_list):
@@ -35,34 +38,48 @@ class ManagePagesTask(ContentManager):
         else:
             return displayed_name
 
-    def delete_item_by_displayed_name(self, displayed_name):
-        super().delete_item_by_displayed_name(self)
-        course_id = self.get_selected_course_id()
+    def delete_item(self, course_id, displayed_name, item):
         url = displayed_name
         self.csh.delete_page_by_url(url, course_id)
 
-    def publish_item_by_displayed_name(self, displayed_name):
-        super().publish_item_by_displayed_name(self)
-        course_id = self.get_selected_course_id()
+    def publish_item(self, course_id, displayed_name, item):
         url = displayed_name
-        self.csh.publish_page_by_url(url, course_id)
+        page = self.csh.publish_page_by_url(url, course_id)
+        if hasattr(page, 'published'):
+            return page
+        item.published = True
+        return item
 
-    def download_item_by_displayed_name(self, displayed_name, output_dir):
-        super().download_item_by_displayed_name(displayed_name, output_dir)
+    def prepare_download(self, course_id, selected_items):
+        super().prepare_download(course_id, selected_items)
+        self.download_pages = {}
+
+        # Listing every page with its body costs one request per MAX_PER_PAGE pages,
+        # so only do it when that is cheaper than fetching each selected page.
+        listing_cost = math.ceil(len(self.loaded_items) / MAX_PER_PAGE)
+        if len(selected_items) > listing_cost:
+            pages = self.csh.get_course_pages(course_id, include_body=True)
+            self.download_pages = {p.url: p for p in pages}
+
+    def download_item(self, course_id, displayed_name, output_dir):
+        super().download_item(course_id, displayed_name, output_dir)
         page_file_suffix = '.html'
-        course_id = self.get_selected_course_id()
         url = displayed_name
-        page = self.csh.get_page(course_id, url)
+        page = self.download_pages.get(url)
+        if page is None:
+            page = self.csh.get_page(course_id, url)
         page_title = page.title
         page_content = self.csh.get_page_content(page)
         file_name = urllib.parse.quote_plus(page_title)
         new_file = Path(output_dir).joinpath(file_name).with_suffix(page_file_suffix)
         if new_file.exists():
-            answer = messagebox.askokcancel(f'File Already Exists',
-                                            message=f'The following page already exists:'
-                                            f'\n\n{new_file}'
-                                            '\n\nDo you wish to overwrite it?',
-                                            icon='warning')
+            # Downloads run on a background thread, so the prompt is shown by the main thread.
+            answer = self.executor.call_on_main_thread(
+                lambda: messagebox.askokcancel(f'File Already Exists',
+                                               message=f'The following page already exists:'
+                                               f'\n\n{new_file}'
+                                               '\n\nDo you wish to overwrite it?',
+                                               icon='warning'))
             if not answer:
                 return
         new_file.write_text(page_content, encoding='utf-8')
@@ -76,7 +93,9 @@ class ManagePagesTask(ContentManager):
         return k
 
     def double_click_callback(self):
-        course_id = self.get_selected_course_id()
-        page_short_url = self.get_selected_item()
-        page_url = self.csh.get_page_url(course_id, page_short_url)
+        selected = self.get_selected_item_objects()
+        if not selected:
+            return
+        # The page belongs to the course the list was loaded from, which may no longer be the selected one.
+        page_url = self.csh.get_page_url(self.loaded_course_id, selected[0].url)
         webbrowser.open(page_url)
@@ -3,7 +3,8 @@ import tkinter
 import webbrowser
 from tkinter import ttk
 
-from canvas_content_uploader.gui_abcs.Task import Task, show_progress_bar
+from canvas_content_uploader.gui_abcs.Task import Task
+from canvas_content_uploader.root_components.FilterableListbox import FilterableListbox
 
 
 class CourseScope(enum.Enum):
@@ -28,7 +29,6 @@ class SearchPagesTask(Task):
     def __init__(self, master_gui):
         super().__init__(master_gui)
 
-        self.results_var = tkinter.StringVar()
         self.results_lbl_var = tkinter.StringVar('')
 
         self.course_scope_var = tkinter.IntVar()
@@ -83,21 +83,11 @@ class SearchPagesTask(Task):
 
         self.results_frame = ttk.Frame(self.frame)
         self.results_lbl = ttk.Label(self.results_frame, text='No Results', textvariable=self.results_lbl_var)
-        self.results_listbox = tkinter.Listbox(self.results_frame, width=50, relief='sunken', state='disabled',
-                                               activestyle='none', listvariable=self.results_var)
-        self.results_listbox.bind('<Double-1>', lambda x: self.open_selected_page())
-
-        self.x_scroll = ttk.Scrollbar(self.results_frame, orient='vertical',
-                                      command=self.results_listbox.yview)
-        self.y_scroll = ttk.Scrollbar(self.results_frame, orient='horizontal',
-                                      command=self.results_listbox.xview)
-        self.results_listbox.configure(xscrollcommand=self.y_scroll.set,
-                                       yscrollcommand=self.x_scroll.set)
+        self.results_list = FilterableListbox(self.results_frame, width=50)
+        self.results_list.bind_double_click(self.open_selected_page)
 
         self.results_lbl.grid(row=0, column=0, sticky='W')
-        self.results_listbox.grid(row=1, column=0, sticky='EW')
-        self.x_scroll.grid(row=1, column=1, sticky='NS')
-        self.y_scroll.grid(row=2, column=0, sticky='EW')
+        self.results_list.grid(row=1, column=0, sticky='EW')
 
         self.entry_frame.grid(row=0, column=0, sticky='EW')
         self.scope_frame.grid(row=1, column=0, sticky='EW')
@@ -108,14 +98,13 @@ class SearchPagesTask(Task):
         pass
 
     def enable_selection(self):
-        self.results_listbox.configure(state='normal')
+        self.results_list.enable()
         self.entry_lbl.configure(state='enabled')
         self.entry_box.configure(state='enabled')
         self.search_btn.configure(state='enabled')
 
     def get_selected_page(self):
-        index = self.results_listbox.curselection()
-        page = self.results_listbox.get(index)
+        page = self.results_list.get_selected_names()[0]
         return page
 
     def open_selected_page(self):
@@ -125,22 +114,23 @@ class SearchPagesTask(Task):
     def get_selected_course_id(self):
         return super().get_selected_course_id()
 
-    @show_progress_bar
     def search_btn_callback(self):
-        self.search_btn.configure(state='disabled')
-        try:
-            results = self.search_pages_for_string()
-            self.results_var.set(results)
-            self.update_results_label()
-        finally:
-            self.search_btn.configure(state='enabled')
-
-    def search_pages_for_string(self):
         search_string = str(self.entry_box.get()).strip()
-        assert search_string
-        course_scope = self.course_scope_var.get()
-        word_scope = self.word_scope_var.get()
-        case_scope = self.case_scope_var.get()
+        if not search_string:
+            return
+
+        self.search_btn.configure(state='disabled')
+        self.results_list.set_names([])
+        self.results_lbl_var.set('Searching...')
+
+        self.run_in_background(self.search_pages_for_string, search_string,
+                               self.course_scope_var.get(), self.word_scope_var.get(), self.case_scope_var.get(),
+                               self.get_selected_course_id(),
+                               on_progress=self.add_result,
+                               on_done=self.finish_search,
+                               on_error=self.handle_search_error)
+
+    def search_pages_for_string(self, job, search_string, course_scope, word_scope, case_scope, course_id):
         pages = []
 
         if word_scope == WordScope.FULL.value:
@@ -156,18 +146,36 @@ class SearchPagesTask(Task):
         if course_scope == CourseScope.ENROLLED.value:
             pages = self.csh.search_pages_from_enrolled_courses(search_string,
                                                                 whole_word=whole_word,
-                                                                ignore_case=ignore_case)
+                                                                ignore_case=ignore_case,
+                                                                cancel_event=job.cancel_event)
         elif course_scope == CourseScope.SELECTED.value:
-            course_id = self.get_selected_course_id()
             pages = self.csh.search_pages_from_course(course_id, search_string,
                                                       whole_word=whole_word,
-                                                      ignore_case=ignore_case)
+                                                      ignore_case=ignore_case,
+                                                      cancel_event=job.cancel_event)
+
+        # Each match is shown as soon as it is found, rather than when the whole search finishes.
+        for p in pages:
+            job.report_progress(p.html_url)
+
+        return job.cancelled
+
+    def add_result(self, page_url):
+        self.results_list.add_names([page_url])
+        self.update_results_label()
+
+    def finish_search(self, canceled=False):
+        self.update_results_label()
+        if canceled:
+            self.results_lbl_var.set(self.results_lbl_var.get() + ' (Search Canceled)')
+        self.search_btn.configure(state='enabled')
 
-        results = [p.html_url for p in pages]
-        return results
+    def handle_search_error(self, e):
+        self.finish_search()
+        self.executor.show_error(e)
 
     def update_results_label(self):
-        num_results = len(self.results_listbox.get(0, 'end'))
+        num_results = len(self.results_list)
 
         if num_results < 1:
             msg = 'No Matches Found.'
@@ -1,6 +1,7 @@
 from pathlib import Path
 
 from canvas_content_uploader.gui_abcs.ContentUploader import ContentUploader
+from canvas_content_uploader.root_components.CourseDataModel import ContentKind
 
 
 class UploadFilesTask(ContentUploader):
@@ -9,8 +10,9 @@ class UploadFilesTask(ContentUploader):
     """
     def __init__(self, master_gui):
         super().__init__(master_gui, 'File', check_for_conflicts=False, title_required=False)
+        self.content_kind = ContentKind.FILES
 
-    def get_existing_item_titles_as_list(self) -> list:
+    def get_existing_item_titles_as_list(self, course_id: int) -> list:
         pass
 
     def prepare_item_with_title(self, file_path: Path, title: str):
@@ -19,13 +21,11 @@ class UploadFilesTask(ContentUploader):
     def handle_course_change(self):
         pass
 
-    def overwrite_item(self, title: str, new_item):
+    def overwrite_item(self, title: str, new_item, course_id: int):
         pass
 
     def get_title_from_file_path(self, file_path: Path) -> str:
         pass
 
-    def upload_item_to_course(self, item):
-        super().upload_item_to_course(item)
-        course_id = self.get_selected_course_id()
-        self.csh.upload_file_to_course(item, course_id)
+    def upload_item_to_course(self, item, course_id: int, progress_callback=None):
+        self.csh.upload_file_to_course(item, course_id, progress_callback=progress_callback)
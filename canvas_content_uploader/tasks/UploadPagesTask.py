@@ -1,7 +1,10 @@
+from collections import Counter
 from pathlib import Path
+from typing import Set
 import urllib.parse
 
 from canvas_content_uploader.gui_abcs.ContentUploader import ContentUploader
+from canvas_content_uploader.root_components.CourseDataModel import ContentKind
 
 
 class UploadPagesTask(ContentUploader):
@@ -11,24 +14,39 @@ class UploadPagesTask(ContentUploader):
     def __init__(self, master_gui):
         super().__init__(master_gui, 'Page')
         self.browse_file_types = ("html files", "*.html")
+        self.content_kind = ContentKind.PAGES
+        self.existing_pages = []
+        self.existing_page_urls = {}
 
     def handle_course_change(self):
         pass
 
-    def get_existing_item_titles_as_list(self) -> list:
-        course_id = self.get_selected_course_id()
-        existing_titles = self.csh.get_course_page_titles(course_id)
+    def get_existing_item_titles_as_list(self, course_id: int) -> list:
+        # Always list the course again, so conflicts are checked against the current pages.
+        self.existing_pages = list(self.csh.get_course_pages(course_id))
+        self.course_data.set_items(self.content_kind, course_id, self.existing_pages)
+        self.existing_page_urls = {p.title: p.url for p in self.existing_pages}
+        existing_titles = list(self.existing_page_urls)
         return existing_titles
 
-    def upload_item_to_course(self, item):
-        super().upload_item_to_course(item)
-        course_id = self.get_selected_course_id()
+    def get_existing_item_hashes(self, titles: Set[str]) -> dict:
+        pages = [p for p in self.existing_pages if p.title in titles]
+        # Listing the course again with bodies costs a request per hundred of all its pages, not just these.
+        listed_counts = Counter(p.course_id for p in self.existing_pages)
+        contents = self.csh.get_page_contents(pages, listed_counts=listed_counts)
+        existing_hashes = {p.title: self.csh.get_body_hash(content) for p, content in contents}
+        return existing_hashes
+
+    def get_item_hash(self, file_path: Path) -> str:
+        body = file_path.read_text(encoding='utf-8')
+        return self.csh.get_body_hash(body)
+
+    def upload_item_to_course(self, item, course_id: int, progress_callback=None):
         self.csh.add_page_to_course(item, course_id)
 
-    def overwrite_item(self, title, new_item):
-        super().overwrite_item(title, new_item)
-        course_id = self.get_selected_course_id()
-        self.csh.overwrite_page_by_url(course_id, title, new_item)
+    def overwrite_item(self, title, new_item, course_id: int):
+        url = self.existing_page_urls.get(title, title)
+        self.csh.overwrite_page_by_url(course_id, url, new_item)
 
     def prepare_item_with_title(self, file_path: Path, title) -> dict:
         body = file_path.read_text(encoding='utf-8')
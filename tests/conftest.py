@@ -0,0 +1,66 @@
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubCanvasServer:
+    """
+    A local HTTP server standing in for Canvas, which answers each request with the reply of a test's handler.
+
+    The handler gets the method, path, parsed query string and decoded JSON body of a request, and returns its status,
+    headers and body. A body that isn't a string is sent as JSON. Every request is kept in requests, in order.
+    """
+    def __init__(self):
+        self.handler = None
+        self.requests = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.make_request_handler())
+        self.url = f'http://127.0.0.1:{self.server.server_port}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def make_request_handler(self):
+        stub = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.reply()
+
+            def do_POST(self):
+                self.reply()
+
+            def reply(self):
+                url = urllib.parse.urlparse(self.path)
+                length = int(self.headers.get('Content-Length') or 0)
+                raw_body = self.rfile.read(length) if length else b''
+                body = json.loads(raw_body) if self.headers.get('Content-Type') == 'application/json' else raw_body
+                query = urllib.parse.parse_qs(url.query)
+
+                stub.requests.append((self.command, url.path, query, body))
+                status, headers, reply_body = stub.handler(self.command, url.path, query, body)
+                if not isinstance(reply_body, str):
+                    reply_body = json.dumps(reply_body)
+                    headers = {'Content-Type': 'application/json', **headers}
+                data = reply_body.encode('utf-8')
+
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return RequestHandler
+
+
+@pytest.fixture
+def stub_server():
+    stub = StubCanvasServer()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
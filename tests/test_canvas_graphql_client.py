@@ -0,0 +1,101 @@
+import logging
+
+import requests
+
+from canvas_content_uploader.root_components.CanvasGraphQLClient import CanvasGraphQLClient
+from canvas_content_uploader.root_components.CanvasSessionHandler import CanvasSessionHandler
+
+
+def make_page_node(page_id, body=None):
+    node = {'_id': str(page_id), 'title': f'Page {page_id}', 'url': f'page-{page_id}', 'published': True,
+            'createdAt': '2024-01-02T03:04:05-07:00', 'updatedAt': '2024-01-02T03:04:05Z'}
+    if body is not None:
+        node['body'] = body
+    return node
+
+
+def make_connection(connection, nodes, end_cursor=None):
+    page_info = {'hasNextPage': end_cursor is not None, 'endCursor': end_cursor}
+    return {'data': {'course': {connection: {'nodes': nodes, 'pageInfo': page_info}}}}
+
+
+def make_client(stub_server):
+    return CanvasGraphQLClient(f'{stub_server.url}/api/graphql', requests.Session(), 'token')
+
+
+def test_pages_are_listed_by_following_the_cursor(stub_server):
+    replies = {None: make_connection('pagesConnection', [make_page_node(1), make_page_node(2)], 'cursor-1'),
+               'cursor-1': make_connection('pagesConnection', [make_page_node(3)])}
+    stub_server.handler = lambda method, path, query, body: (200, {}, replies[body['variables']['after']])
+
+    pages = make_client(stub_server).get_course_pages(42)
+
+    assert [x['page_id'] for x in pages] == [1, 2, 3]
+    assert [body['variables']['after'] for _, _, _, body in stub_server.requests] == [None, 'cursor-1']
+    assert all(body['variables']['courseId'] == '42' for _, _, _, body in stub_server.requests)
+
+
+def test_page_bodies_are_only_returned_when_requested(stub_server):
+    def handler(method, path, query, body):
+        include_body = body['variables']['includeBody']
+        return 200, {}, make_connection('pagesConnection', [make_page_node(1, '<p>Hi</p>' if include_body else None)])
+    stub_server.handler = handler
+    client = make_client(stub_server)
+
+    assert client.get_course_pages(42, include_body=True)[0]['body'] == '<p>Hi</p>'
+    assert 'body' not in client.get_course_pages(42)[0]
+    assert [body['variables']['includeBody'] for _, _, _, body in stub_server.requests] == [True, False]
+
+
+def test_timestamps_and_folders_are_converted_to_the_rest_format(stub_server):
+    node = {'_id': '7', 'displayName': 'notes.pdf', 'size': 10, 'url': 'https://example.com/notes.pdf',
+            'createdAt': '2024-01-02T03:04:05-07:00', 'updatedAt': '2024-01-02T23:30:00.123+05:30',
+            'folder': {'_id': '12'}}
+    stub_server.handler = lambda method, path, query, body: (200, {}, make_connection('filesConnection', [node]))
+
+    file, = make_client(stub_server).get_course_files(42)
+
+    assert file['id'] == 7
+    assert file['folder_id'] == 12
+    assert file['created_at'] == '2024-01-02T10:04:05Z'
+    assert file['modified_at'] == '2024-01-02T18:00:00Z'
+    assert CanvasGraphQLClient.to_rest_timestamp('2024-01-02T03:04:05Z') == '2024-01-02T03:04:05Z'
+    assert CanvasGraphQLClient.to_rest_timestamp(None) is None
+
+
+def test_rejected_queries_fall_back_to_rest_and_disable_only_that_listing(stub_server, caplog):
+    rest_pages = [{'page_id': 1, 'title': 'Page 1', 'url': 'page-1', 'published': True,
+                   'created_at': '2024-01-02T10:04:05Z', 'updated_at': '2024-01-02T10:04:05Z'}]
+    file_node = {'_id': '7', 'displayName': 'notes.pdf', 'size': 10, 'url': 'https://example.com/notes.pdf',
+                 'createdAt': '2024-01-02T03:04:05Z', 'updatedAt': '2024-01-02T03:04:05Z', 'folder': None}
+
+    def handler(method, path, query, body):
+        if path == '/api/graphql' and 'pagesConnection' in body['query']:
+            return 200, {}, {'errors': [{'message': "Field 'pagesConnection' doesn't exist on type 'Course'"}]}
+        if path == '/api/graphql':
+            return 200, {}, make_connection('filesConnection', [file_node])
+        if path == '/api/v1/courses/42':
+            return 200, {}, {'id': 42, 'name': 'Course'}
+        if path == '/api/v1/courses/42/pages':
+            return 200, {}, rest_pages
+        return 404, {}, {'errors': [{'message': 'Not found'}]}
+    stub_server.handler = handler
+
+    session_handler = CanvasSessionHandler(stub_server.url, inventory_backend='graphql')
+    session_handler.token = 'token'
+    session_handler.login()
+    with caplog.at_level(logging.WARNING):
+        pages = session_handler.get_course_pages(42)
+
+    assert [x.title for x in pages] == ['Page 1']
+    assert 'GraphQL pages listings are disabled' in caplog.text
+
+    # Later page listings go straight to the REST API, while files are still listed through GraphQL.
+    session_handler.get_course_pages(42)
+    files = session_handler.get_course_files(42)
+    assert [(x.id, x.folder_id) for x in files] == [(7, None)]
+
+    paths = [path for _, path, _, _ in stub_server.requests]
+    assert paths.count('/api/graphql') == 2
+    assert paths.count('/api/v1/courses/42/pages') == 2
+    assert '/api/v1/courses/42/files' not in paths
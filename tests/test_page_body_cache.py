@@ -0,0 +1,34 @@
+import itertools
+import types
+
+from canvas_content_uploader.root_components import PageBodyCache as page_body_cache_module
+from canvas_content_uploader.root_components.PageBodyCache import PageBodyCache
+
+
+def test_bodies_are_only_returned_for_their_updated_at(tmp_path):
+    cache = PageBodyCache(tmp_path / 'cache.sqlite3', 1024)
+    cache.put_many([(1, 'a', 'v1', 'one'), (1, 'b', 'v1', None)])
+
+    assert cache.get(1, 'a', 'v1') == 'one'
+    assert cache.get('1', 'b', 'v1') == ''
+    assert cache.get(1, 'a', 'v2') is None
+
+    cache.put_many([(1, 'a', 'v2', 'two')])
+    assert cache.get(1, 'a', 'v2') == 'two'
+
+
+def test_least_recently_used_bodies_are_evicted_in_batches(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(page_body_cache_module, 'time', types.SimpleNamespace(time=lambda: next(clock)))
+    monkeypatch.setattr(page_body_cache_module, 'EVICT_BATCH_SIZE', 3)
+    cache = PageBodyCache(tmp_path / 'cache.sqlite3', 100)
+    for i in range(10):
+        cache.put_many([(1, f'page-{i}', 'v1', 'x' * 10)])
+    assert cache.get(1, 'page-0', 'v1') is not None
+
+    # Reading page-0 makes it the most recently used, so the next pages in line are evicted instead.
+    cache.put_many([(1, f'new-{i}', 'v1', 'x' * 10) for i in range(7)])
+
+    kept = [i for i in range(10) if cache.get(1, f'page-{i}', 'v1') is not None]
+    assert kept == [0, 8, 9]
+    assert all(cache.get(1, f'new-{i}', 'v1') is not None for i in range(7))
@@ -0,0 +1,58 @@
+import types
+
+import pytest
+
+from canvas_content_uploader.root_components.CanvasSessionHandler import CanvasSessionHandler
+from canvas_content_uploader.root_components.PageSearchIndex import PageSearchIndex
+
+
+def make_page(course_id, url, updated_at='2024-01-01T00:00:00Z'):
+    return types.SimpleNamespace(course_id=course_id, url=url, updated_at=updated_at, title=url)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return PageSearchIndex(tmp_path / 'index.sqlite3', 10 * 1024 ** 2)
+
+
+def test_candidates_fold_case_like_an_ignorecase_regex(index):
+    index.add_many([(1, 'city', 'v1', '<p>İSTANBUL</p>'), (1, 'other', 'v1', '<p>Ankara</p>')])
+
+    assert ('1', 'city') in index.get_candidates('ist', [1])
+    assert ('1', 'other') not in index.get_candidates('istanbul', [1], whole_word=True)
+
+
+def test_candidates_only_come_from_the_given_courses(index):
+    index.add_many([(1, 'a', 'v1', 'apple pie'), (2, 'b', 'v1', 'apple tart')])
+
+    assert index.get_candidates('apple', [1]) == {('1', 'a')}
+    assert index.get_candidates('apple', [1, 2]) == {('1', 'a'), ('2', 'b')}
+    assert index.get_candidates('ap', [1]) is None
+
+
+def test_a_few_changed_pages_are_fetched_without_listing_the_course_again(tmp_path):
+    handler = CanvasSessionHandler('https://canvas.example.com', page_index_path=tmp_path / 'index.sqlite3')
+    bodies = {f'page-{i}': f'<p>Page {i}</p>' for i in range(2000)}
+    fetches = []
+
+    def fetch_page_contents(pages):
+        fetches.append([p.url for p in pages])
+        return [(p, bodies[p.url]) for p in pages]
+
+    def fetch_course_page_contents(course_id, urls):
+        fetches.append(('whole course', course_id))
+        return [(make_page(course_id, x), bodies[x]) for x in urls]
+
+    handler.fetch_page_contents = fetch_page_contents
+    handler.fetch_course_page_contents = fetch_course_page_contents
+    list(handler.search_pages_with_term('missing', [make_page(1, x) for x in bodies]))
+    assert fetches == [('whole course', 1)]
+
+    fetches.clear()
+    edited = {'page-7', 'page-8', 'page-9'}
+    bodies['page-8'] = '<p>Now missing</p>'
+    pages = [make_page(1, x, 'v2' if x in edited else '2024-01-01T00:00:00Z') for x in bodies]
+    matches = list(handler.search_pages_with_term('missing', pages))
+
+    assert [x.url for x in matches] == ['page-8']
+    assert sorted(fetches) == [['page-7'], ['page-8'], ['page-9']]
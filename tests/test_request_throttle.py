@@ -0,0 +1,236 @@
+import threading
+import time
+import types
+
+import pytest
+
+from canvas_content_uploader.root_components import CanvasHttpSession as http_session_module
+from canvas_content_uploader.root_components import RequestThrottle as throttle_module
+from canvas_content_uploader.root_components.CanvasHttpSession import CanvasHttpSession
+from canvas_content_uploader.root_components.CanvasSessionHandler import CanvasSessionHandler
+from canvas_content_uploader.root_components.RequestThrottle import RequestThrottle, DECREASE_INTERVAL
+
+RATE_LIMITED = (403, {}, '403 Forbidden (Rate Limit Exceeded)')
+
+
+def rate_limit_reply(remaining, cost=1.0):
+    return 200, {'X-Rate-Limit-Remaining': str(remaining), 'X-Request-Cost': str(cost)}, {}
+
+
+class LeakyBucket:
+    """
+    Rate limit requests to the stub server the way Canvas does, with a bucket that each request fills by its cost and
+    that drains at a steady rate. Requests that would overflow the bucket are rejected as throttled.
+    """
+    def __init__(self, capacity: float, cost: float, drain_rate: float, duration: float):
+        self.capacity = capacity
+        self.cost = cost
+        self.drain_rate = drain_rate
+        self.duration = duration
+        self.level = 0.0
+        self.drained_at = time.monotonic()
+        self.running = 0
+        self.max_running = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args):
+        with self.lock:
+            now = time.monotonic()
+            self.level = max(0.0, self.level - (now - self.drained_at) * self.drain_rate)
+            self.drained_at = now
+            if self.level + self.cost > self.capacity:
+                self.rejected += 1
+                return 403, {'X-Rate-Limit-Remaining': str(self.capacity - self.level)}, RATE_LIMITED[2]
+            self.level += self.cost
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        time.sleep(self.duration)
+        with self.lock:
+            self.running -= 1
+            return rate_limit_reply(self.capacity - self.level, self.cost)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Replace the throttle's clock with one that only moves when a test advances it.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(throttle_module, 'time', types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(http_session_module, 'time', types.SimpleNamespace(sleep=delays.append))
+    return delays
+
+
+def make_session(max_limit=8):
+    return CanvasHttpSession(RequestThrottle(max_limit))
+
+
+def test_low_remaining_halves_the_limit(stub_server, clock):
+    stub_server.handler = lambda *args: rate_limit_reply(50)
+    session = make_session()
+
+    session.get(stub_server.url)
+
+    assert session.throttle.limit == 4
+
+
+def test_in_flight_requests_count_against_the_remaining_bucket(stub_server, clock):
+    release = threading.Event()
+    arrived = threading.Semaphore(0)
+
+    def handler(method, path, query, body):
+        if path == '/slow':
+            arrived.release()
+            release.wait(5)
+            return 200, {}, {}
+        return rate_limit_reply(200, cost=30)
+    stub_server.handler = handler
+    session = make_session()
+
+    slow_requests = [threading.Thread(target=session.get, args=(f'{stub_server.url}/slow',)) for _ in range(4)]
+    for x in slow_requests:
+        x.start()
+    for _ in slow_requests:
+        assert arrived.acquire(timeout=5)
+
+    try:
+        # The four requests still in flight, at 30 units each, would take the bucket below the low water mark.
+        session.get(stub_server.url)
+        assert session.throttle.in_flight == 4
+        assert session.throttle.limit == 4
+    finally:
+        release.set()
+        for x in slow_requests:
+            x.join()
+
+
+def test_limit_is_halved_at_most_once_per_decrease_interval(stub_server, clock):
+    stub_server.handler = lambda *args: rate_limit_reply(50)
+    session = make_session()
+
+    session.get(stub_server.url)
+    clock[0] += DECREASE_INTERVAL / 2
+    session.get(stub_server.url)
+    assert session.throttle.limit == 4
+
+    clock[0] += DECREASE_INTERVAL
+    session.get(stub_server.url)
+    assert session.throttle.limit == 2
+
+
+def test_limit_never_drops_below_the_minimum(stub_server, clock):
+    stub_server.handler = lambda *args: rate_limit_reply(0)
+    session = make_session(max_limit=2)
+
+    for _ in range(3):
+        session.get(stub_server.url)
+        clock[0] += DECREASE_INTERVAL
+
+    assert session.throttle.limit == 1
+
+
+def test_limit_grows_additively_back_to_the_maximum(stub_server, clock):
+    replies = iter([rate_limit_reply(50)] + [rate_limit_reply(600)] * 40)
+    stub_server.handler = lambda *args: next(replies)
+    session = make_session()
+
+    session.get(stub_server.url)
+    assert session.throttle.limit == 4
+
+    # Each success adds 1 / limit, so the limit grows by about one request per limit successful responses.
+    limits = []
+    for _ in range(40):
+        session.get(stub_server.url)
+        limits.append(session.throttle.limit)
+
+    assert limits[:4] == pytest.approx([4.25, 4.25 + 1 / 4.25, limits[1] + 1 / limits[1], limits[2] + 1 / limits[2]])
+    assert limits == sorted(limits)
+    assert 5 <= limits[4] < 6
+    assert limits[-1] == 8
+
+
+def test_rate_limited_requests_are_retried_with_backoff(stub_server, clock, sleeps):
+    replies = iter([RATE_LIMITED, RATE_LIMITED, (200, {}, {'ok': True})])
+    stub_server.handler = lambda *args: next(replies)
+    session = make_session()
+
+    response = session.get(stub_server.url)
+
+    assert response.json() == {'ok': True}
+    assert len(stub_server.requests) == 3
+    assert sleeps == [http_session_module.RETRY_DELAY * 1, http_session_module.RETRY_DELAY * 2]
+    # Both rejections arrived within one decrease interval, so only the first halved the limit.
+    assert session.throttle.limit == pytest.approx(4 + 1 / 4)
+
+
+def test_retries_stop_after_the_maximum_attempts(stub_server, clock, sleeps):
+    stub_server.handler = lambda *args: RATE_LIMITED
+    session = make_session()
+
+    response = session.get(stub_server.url)
+
+    assert response.status_code == 403
+    assert len(stub_server.requests) == http_session_module.MAX_RETRIES + 1
+    assert sleeps == [http_session_module.RETRY_DELAY * x for x in range(1, http_session_module.MAX_RETRIES + 1)]
+
+
+def test_other_forbidden_responses_are_not_retried(stub_server, clock, sleeps):
+    stub_server.handler = lambda *args: (403, {}, {'errors': [{'message': 'user not authorized'}]})
+    session = make_session()
+
+    response = session.get(stub_server.url)
+
+    assert response.status_code == 403
+    assert len(stub_server.requests) == 1
+    assert sleeps == []
+    assert session.throttle.limit == 8
+
+
+def run_parallel_load(stub_server, throttle, requests=200):
+    """
+    Send requests through a session using throttle, from twice as many worker threads as its maximum limit.
+    """
+    session = CanvasHttpSession(throttle)
+    handler = CanvasSessionHandler('https://canvas.example.com', max_concurrency=throttle.max_limit * 2)
+    return [future.result().status_code
+            for _, future in handler.map_concurrently(lambda _: session.get(stub_server.url), range(requests))]
+
+
+@pytest.fixture
+def fast_adaptation(monkeypatch):
+    monkeypatch.setattr(throttle_module, 'DECREASE_INTERVAL', .1)
+    monkeypatch.setattr(http_session_module, 'RETRY_DELAY', .05)
+
+
+def test_parallel_requests_adapt_to_a_leaky_bucket(stub_server, fast_adaptation):
+    # The bucket drains fast enough for about four requests at once.
+    bucket = LeakyBucket(capacity=200, cost=10, drain_rate=2000, duration=.02)
+    stub_server.handler = bucket
+    throttle = RequestThrottle(16, low_remaining=60)
+
+    statuses = run_parallel_load(stub_server, throttle)
+
+    assert statuses == [200] * len(statuses)
+    assert 1 < bucket.max_running <= 16
+    assert throttle.in_flight == 0
+    assert throttle.limit < 16
+    assert bucket.rejected <= 10
+
+
+def test_a_fixed_limit_overflows_the_same_leaky_bucket(stub_server, fast_adaptation):
+    bucket = LeakyBucket(capacity=200, cost=10, drain_rate=2000, duration=.02)
+    stub_server.handler = bucket
+    throttle = RequestThrottle(16, min_limit=16, low_remaining=60)
+
+    run_parallel_load(stub_server, throttle)
+
+    assert bucket.max_running <= 16
+    assert bucket.rejected > 40